@@ -0,0 +1,35 @@
+"""
+Airflow Local Settings
+
+Loaded once by every Airflow process at startup. With the LocalExecutor,
+task processes are forked from the scheduler, so modules imported here are
+inherited already initialised instead of being re-imported by each task.
+"""
+import importlib
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Heavy third-party libraries first, then the project modules used by the DAGs
+PRELOAD_MODULES = [
+    "numpy",
+    "pandas",
+    "pyarrow",
+    "psycopg2",
+    "sklearn.feature_extraction.text",
+    "sklearn.linear_model",
+    "mlflow",
+    "src.data.db_pool",
+    "src.data.loader",
+    "src.data.dataset_generator",
+    "src.models.auto_trainer",
+    "src.models.promotion_engine",
+    "src.monitoring.drift_monitor",
+    "src.monitoring.alerting",
+]
+
+for _module in PRELOAD_MODULES:
+    try:
+        importlib.import_module(_module)
+    except Exception as e:  # never prevent Airflow from starting
+        logger.warning(f"Could not pre-import {_module}: {e}")
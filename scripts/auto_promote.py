@@ -45,17 +45,14 @@ def main():
     engine = PromotionEngine(min_f1_threshold=args.min_f1)
 
     if args.latest:
-        import mlflow
-        from mlflow.tracking import MlflowClient
-        from src.models.model_registry import get_latest_model_version
+        from src.models.model_registry import get_latest_model_version, get_run
 
         latest = get_latest_model_version("rakuten_classifier")
         if latest is None:
             logger.error("No model versions found in registry")
             sys.exit(1)
 
-        client = MlflowClient()
-        run = client.get_run(latest["run_id"])
+        run = get_run(latest["run_id"])
         f1_score = run.data.metrics.get("test_f1_weighted", 0.0)
 
         result = engine.evaluate_and_promote(
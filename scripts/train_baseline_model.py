@@ -14,10 +14,12 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 import os
-import pandas as pd
 import logging
 import argparse
 import psycopg2
+import pyarrow as pa
+
+from src.data.bulk import copy_query_to_arrow
 
 # Configure logging
 logging.basicConfig(
@@ -51,6 +53,14 @@ def load_data_from_database():
     JOIN labels l ON p.productid = l.productid
     ORDER BY p.productid
     """
+    schema = pa.schema([
+        ("productid", pa.int64()),
+        ("designation", pa.string()),
+        ("description", pa.string()),
+        ("imageid", pa.int64()),
+        ("image_path", pa.string()),
+        ("prdtypecode", pa.int64()),
+    ])
 
     # Use psycopg2 directly to avoid SQLAlchemy compatibility issues
     conn = psycopg2.connect(
@@ -61,10 +71,15 @@ def load_data_from_database():
         password=postgres_password
     )
     try:
-        df = pd.read_sql_query(query, conn)
+        # COPY TO STDOUT parsed by Arrow: no per-value Python objects on the way in
+        cursor = conn.cursor()
+        table = copy_query_to_arrow(cursor, query, schema)
+        cursor.close()
     finally:
         conn.close()
 
+    df = table.to_pandas(self_destruct=True)
+
     logger.info(f"Loaded {len(df)} samples from database")
     logger.info(f"Classes: {df['prdtypecode'].nunique()}")
 
@@ -14,6 +14,11 @@ load_dotenv()
 PROJECT_ROOT = Path(__file__).parent.parent
 DATA_PATH = Path(os.getenv("DATA_PATH", PROJECT_ROOT / "data" / "raw"))
 TRAINING_SNAPSHOTS_PATH = PROJECT_ROOT / "data" / "training_snapshots"
+DATASET_CACHE_PATH = Path(os.getenv("DATASET_CACHE_PATH", PROJECT_ROOT / "data" / "cache"))
+DATASET_CACHE_TTL_DAYS = int(os.getenv("DATASET_CACHE_TTL_DAYS", "7"))
+INFERENCE_LOG_PATH = Path(
+    os.getenv("INFERENCE_LOG_PATH", PROJECT_ROOT / "data" / "monitoring" / "inference_log.csv")
+)
 
 # PostgreSQL Configuration
 POSTGRES_CONFIG = {
@@ -22,6 +27,19 @@ POSTGRES_CONFIG = {
     "database": os.getenv("POSTGRES_DB", "rakuten_db"),
     "user": os.getenv("POSTGRES_USER", "rakuten_user"),
     "password": os.getenv("POSTGRES_PASSWORD", "rakuten_pass"),
+    # TCP keepalives so pooled connections idling between tasks stay open
+    "keepalives": 1,
+    "keepalives_idle": int(os.getenv("POSTGRES_KEEPALIVES_IDLE", "30")),
+}
+
+# Bulk load mode for load_incremental_data: "copy" (COPY FROM STDIN via a
+# staging table) or "insert" (batched INSERT ... ON CONFLICT)
+LOAD_MODE = os.getenv("LOAD_MODE", "copy")
+
+# Connection pool sizing (per worker process)
+POSTGRES_POOL_CONFIG = {
+    "minconn": int(os.getenv("POSTGRES_POOL_MINCONN", "1")),
+    "maxconn": int(os.getenv("POSTGRES_POOL_MAXCONN", "5")),
 }
 
 # Database connection string for SQLAlchemy
@@ -118,6 +136,7 @@ def validate_config() -> bool:
 def create_directories():
     """Create necessary directories if they don't exist"""
     TRAINING_SNAPSHOTS_PATH.mkdir(parents=True, exist_ok=True)
+    DATASET_CACHE_PATH.mkdir(parents=True, exist_ok=True)
     DATA_PATH.mkdir(parents=True, exist_ok=True)
 
 
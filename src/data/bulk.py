@@ -0,0 +1,161 @@
+"""
+Bulk Load Helpers
+Stream DataFrames into PostgreSQL with COPY FROM STDIN instead of INSERTs,
+and query results out of it with COPY TO STDOUT
+"""
+import io
+import tempfile
+from typing import List
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pv
+from psycopg2.extras import execute_values
+
+# NULL marker used in the CSV stream, so that empty strings stay empty strings
+COPY_NULL = '\\N'
+
+# CSV staging buffer is kept in memory up to this size, then spills to disk
+COPY_SPOOL_MAX_BYTES = 64 * 1024 * 1024
+
+
+def copy_dataframe(cursor, df: pd.DataFrame, table: str, columns: List[str]):
+    """
+    Stream DataFrame columns into a table using COPY FROM STDIN
+
+    Args:
+        cursor: psycopg2 cursor (transaction is left to the caller)
+        df: DataFrame holding the rows to load
+        table: Target table name
+        columns: Columns to load, in table column order
+    """
+    with tempfile.SpooledTemporaryFile(
+        max_size=COPY_SPOOL_MAX_BYTES, mode='w+', newline=''
+    ) as buffer:
+        df[columns].to_csv(buffer, index=False, header=False, na_rep=COPY_NULL)
+        buffer.seek(0)
+
+        cursor.copy_expert(
+            f"COPY {table} ({', '.join(columns)}) "
+            f"FROM STDIN WITH (FORMAT CSV, NULL '{COPY_NULL}')",
+            buffer
+        )
+
+
+def copy_insert_ignore_conflicts(
+    cursor,
+    df: pd.DataFrame,
+    table: str,
+    columns: List[str],
+    conflict_column: str,
+) -> int:
+    """
+    COPY rows into a temporary staging table, then merge them into the target
+    table with INSERT ... ON CONFLICT DO NOTHING
+
+    COPY has no conflict handling of its own, so staging keeps the
+    insert-if-absent semantics of the previous execute_values path while
+    still shipping the rows in a single stream. Triggers and indexes on the
+    target table are left untouched.
+
+    Args:
+        cursor: psycopg2 cursor (must be inside a transaction)
+        df: DataFrame holding the rows to load
+        table: Target table name
+        columns: Columns to load
+        conflict_column: Column carrying the unique constraint
+
+    Returns:
+        Number of rows actually inserted into the target table
+    """
+    staging = f"stg_{table}"
+    column_list = ', '.join(columns)
+
+    cursor.execute(f"DROP TABLE IF EXISTS {staging}")
+    cursor.execute(f"""
+        CREATE TEMP TABLE {staging} ON COMMIT DROP AS
+        SELECT {column_list} FROM {table} WITH NO DATA
+    """)
+
+    copy_dataframe(cursor, df, staging, columns)
+
+    cursor.execute(f"""
+        INSERT INTO {table} ({column_list})
+        SELECT {column_list} FROM {staging}
+        ON CONFLICT ({conflict_column}) DO NOTHING
+    """)
+    return cursor.rowcount
+
+
+def insert_ignore_conflicts(
+    cursor,
+    df: pd.DataFrame,
+    table: str,
+    columns: List[str],
+    conflict_column: str,
+    page_size: int = 1000,
+) -> int:
+    """
+    Batched INSERT ... ON CONFLICT DO NOTHING (fallback for LOAD_MODE=insert)
+
+    Same arguments and result as copy_insert_ignore_conflicts, for servers
+    or proxies where COPY FROM STDIN is not available.
+
+    Returns:
+        Number of rows actually inserted into the target table
+    """
+    # One tolist() per column (native Python values), zipped into row tuples.
+    # Only columns holding missing values go through object dtype (NaN -> None).
+    column_values = []
+    for column in columns:
+        values = df[column]
+        if values.hasnans:
+            values = values.astype(object).where(values.notna(), None)
+        column_values.append(values.tolist())
+    rows = list(zip(*column_values))
+
+    inserted = execute_values(
+        cursor,
+        f"INSERT INTO {table} ({', '.join(columns)}) VALUES %s "
+        f"ON CONFLICT ({conflict_column}) DO NOTHING RETURNING 1",
+        rows,
+        page_size=page_size,
+        fetch=True
+    )
+    return len(inserted)
+
+
+def copy_query_to_arrow(cursor, query: str, schema: pa.Schema) -> pa.Table:
+    """
+    Run a SELECT through COPY TO STDOUT and parse it with Arrow's CSV reader
+
+    No Python object is built per value, unlike cursor.fetchall() or
+    pd.read_sql_query. NULLs (unquoted empty fields) and empty strings
+    (quoted "") stay distinct.
+
+    Args:
+        cursor: psycopg2 cursor
+        query: SELECT statement (no trailing semicolon)
+        schema: Arrow schema of the result, in SELECT column order
+
+    Returns:
+        pa.Table with the query result
+    """
+    buffer = io.BytesIO()
+    cursor.copy_expert(f"COPY ({query}) TO STDOUT WITH (FORMAT CSV)", buffer)
+    buffer.seek(0)
+
+    return pv.read_csv(
+        buffer,
+        read_options=pv.ReadOptions(column_names=schema.names),
+        # Free text may hold quoted newlines
+        parse_options=pv.ParseOptions(newlines_in_values=True),
+        convert_options=pv.ConvertOptions(
+            column_types=schema,
+            true_values=['t'],
+            false_values=['f'],
+            null_values=[''],
+            strings_can_be_null=True,
+            quoted_strings_can_be_null=False,
+        ),
+    )
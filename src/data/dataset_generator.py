@@ -3,26 +3,34 @@ Balanced Dataset Generator
 Generates balanced training datasets from PostgreSQL and logs them to MLflow
 """
 import sys
+import os
+import hashlib
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
+import numpy as np
 import pandas as pd
-import psycopg2
+import pyarrow as pa
+import pyarrow.parquet as pq
 import mlflow
 import logging
-from collections import Counter
-from imblearn.over_sampling import RandomOverSampler
-import matplotlib.pyplot as plt
-import json
+from matplotlib.figure import Figure
+import orjson
 
 # Add parent directory to path
 sys.path.append(str(Path(__file__).parent.parent.parent))
 
 from src.config import (
-    POSTGRES_CONFIG,
     MLFLOW_CONFIG,
     PIPELINE_CONFIG,
     TRAINING_SNAPSHOTS_PATH,
+    DATASET_CACHE_PATH,
+    DATASET_CACHE_TTL_DAYS,
 )
+from src.data.bulk import copy_query_to_arrow
+from src.data.db_pool import pooled_connection
+from src.models.model_registry import get_client
 
 # Configure logging
 logging.basicConfig(
@@ -31,65 +39,150 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Current dataset extract (products joined with their labels)
+PRODUCTS_QUERY = """
+    SELECT
+        p.productid,
+        p.designation,
+        p.description,
+        p.imageid,
+        p.image_path,
+        l.prdtypecode
+    FROM products p
+    JOIN labels l ON p.productid = l.productid
+    ORDER BY p.created_at
+"""
+
+PRODUCTS_SCHEMA = pa.schema([
+    ('productid', pa.int64()),
+    ('designation', pa.string()),
+    ('description', pa.string()),
+    ('imageid', pa.int64()),
+    ('image_path', pa.string()),
+    ('prdtypecode', pa.int64()),
+])
 
-def get_current_data_from_db():
+
+def get_data_version() -> str:
+    """
+    Fingerprint of the data currently loaded in PostgreSQL
+    
+    Changes every time a data load completes, so it can be used as a cache
+    key (etag) for extracts of the products/labels tables. A single
+    aggregate over data_loads: one round-trip, no table scan.
+    
+    Returns:
+        str: Short hex digest
+    """
+    with pooled_connection() as conn:
+        cursor = conn.cursor()
+        
+        try:
+            cursor.execute("""
+                SELECT MAX(completed_at), SUM(total_rows), COUNT(*)
+                FROM data_loads
+                WHERE status = 'completed'
+            """)
+            
+            result = cursor.fetchone()
+            return hashlib.sha1(repr(result).encode()).hexdigest()[:16]
+        
+        finally:
+            cursor.close()
+
+
+def get_current_data_from_db(use_cache: bool = True):
     """
     Extract current data from PostgreSQL database
     
+    The extract is cached as Parquet under DATASET_CACHE_PATH, keyed by
+    get_data_version(). On a hit the file is memory-mapped instead of
+    re-scanning and re-decoding both tables. Entries older than
+    DATASET_CACHE_TTL_DAYS are rebuilt.
+    
+    Args:
+        use_cache: Read/write the Parquet cache (default: True)
+    
     Returns:
         pd.DataFrame: Current dataset with features and labels
     """
+    cache_file = None
+    if use_cache:
+        cache_file = DATASET_CACHE_PATH / f"products_{get_data_version()}.parquet"
+        if _is_fresh(cache_file):
+            table = pq.read_table(cache_file, memory_map=True)
+            df = table.to_pandas(self_destruct=True)
+            logger.info(f"Loaded {len(df)} rows from cache: {cache_file}")
+            return df
+    
     logger.info("Extracting data from PostgreSQL...")
     
-    conn = psycopg2.connect(**POSTGRES_CONFIG)
+    with pooled_connection() as conn:
+        cursor = conn.cursor()
+        
+        try:
+            table = copy_query_to_arrow(cursor, PRODUCTS_QUERY, PRODUCTS_SCHEMA)
+        finally:
+            cursor.close()
+    
+    df = table.to_pandas(self_destruct=True)
+    logger.info(f"Extracted {len(df)} rows from database")
+    
+    if cache_file is not None:
+        _write_cache(df, cache_file)
     
+    return df
+
+
+def _is_fresh(cache_file: Path) -> bool:
+    """Check that a cache entry exists and is younger than the cache TTL"""
     try:
-        query = """
-        SELECT 
-            p.productid,
-            p.designation,
-            p.description,
-            p.imageid,
-            p.image_path,
-            l.prdtypecode
-        FROM products p
-        JOIN labels l ON p.productid = l.productid
-        ORDER BY p.created_at
-        """
-        
-        df = pd.read_sql_query(query, conn)
-        logger.info(f"Extracted {len(df)} rows from database")
+        age_seconds = time.time() - cache_file.stat().st_mtime
+    except FileNotFoundError:
+        return False
+    return age_seconds < DATASET_CACHE_TTL_DAYS * 86400
+
+
+def _write_cache(df: pd.DataFrame, cache_file: Path):
+    """Write a DataFrame to the Parquet cache atomically (best effort)"""
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = cache_file.with_suffix(".tmp")
+        df.to_parquet(tmp_file, index=False)
+        os.replace(tmp_file, cache_file)
+        logger.info(f"Cached extract to: {cache_file}")
         
-        return df
-    
-    finally:
-        conn.close()
+        # Older versions can never be hit again
+        for stale_file in cache_file.parent.glob("products_*.parquet"):
+            if stale_file != cache_file:
+                stale_file.unlink(missing_ok=True)
+    except Exception as e:
+        logger.warning(f"Failed to write dataset cache: {e}")
 
 
 def get_current_percentage():
     """Get current data loading percentage"""
-    conn = psycopg2.connect(**POSTGRES_CONFIG)
-    cursor = conn.cursor()
-    
-    try:
-        cursor.execute("""
-            SELECT percentage, batch_name
-            FROM data_loads
-            WHERE status = 'completed'
-            ORDER BY percentage DESC
-            LIMIT 1
-        """)
+    with pooled_connection() as conn:
+        cursor = conn.cursor()
         
-        result = cursor.fetchone()
+        try:
+            cursor.execute("""
+                SELECT percentage, batch_name
+                FROM data_loads
+                WHERE status = 'completed'
+                ORDER BY percentage DESC
+                LIMIT 1
+            """)
+            
+            result = cursor.fetchone()
+            
+            if result:
+                return float(result[0]), result[1]
+            else:
+                return 0, 'initial'
         
-        if result:
-            return float(result[0]), result[1]
-        else:
-            return 0, 'initial'
-    
-    finally:
-        cursor.close()
-        conn.close()
+        finally:
+            cursor.close()
 
 
 def analyze_class_distribution(df: pd.DataFrame, title: str = "Class Distribution"):
@@ -103,32 +196,121 @@ def analyze_class_distribution(df: pd.DataFrame, title: str = "Class Distributio
     Returns:
         dict: Class distribution statistics
     """
-    class_counts = Counter(df['prdtypecode'])
+    counts = df['prdtypecode'].value_counts(sort=False)
+    return summarize_class_counts(dict(zip(counts.index.tolist(), counts.tolist())), title)
+
+
+def summarize_class_counts(class_counts: dict, title: str = "Class Distribution"):
+    """
+    Log and summarize per-class sample counts
+    
+    Args:
+        class_counts: Mapping of prdtypecode to sample count
+        title: Title used in the log output
+        
+    Returns:
+        dict: Class distribution statistics
+    """
+    counts = np.fromiter(class_counts.values(), dtype=np.int64, count=len(class_counts))
+    total_samples = int(counts.sum())
+    num_classes = int(counts.size)
+    min_count = int(counts.min())
+    max_count = int(counts.max())
+    mean_count = total_samples / num_classes
     
     logger.info(f"\n📊 {title}:")
-    logger.info(f"  - Total samples: {len(df)}")
-    logger.info(f"  - Number of classes: {len(class_counts)}")
-    logger.info(f"  - Min class size: {min(class_counts.values())}")
-    logger.info(f"  - Max class size: {max(class_counts.values())}")
-    logger.info(f"  - Mean class size: {sum(class_counts.values()) / len(class_counts):.1f}")
+    logger.info(f"  - Total samples: {total_samples}")
+    logger.info(f"  - Number of classes: {num_classes}")
+    logger.info(f"  - Min class size: {min_count}")
+    logger.info(f"  - Max class size: {max_count}")
+    logger.info(f"  - Mean class size: {mean_count:.1f}")
     
     # Calculate imbalance ratio
-    max_count = max(class_counts.values())
-    min_count = min(class_counts.values())
     imbalance_ratio = max_count / min_count if min_count > 0 else float('inf')
     logger.info(f"  - Imbalance ratio: {imbalance_ratio:.2f}")
     
     return {
-        'total_samples': len(df),
-        'num_classes': len(class_counts),
-        'min_class_size': min(class_counts.values()),
-        'max_class_size': max(class_counts.values()),
-        'mean_class_size': sum(class_counts.values()) / len(class_counts),
+        'total_samples': total_samples,
+        'num_classes': num_classes,
+        'min_class_size': min_count,
+        'max_class_size': max_count,
+        'mean_class_size': mean_count,
         'imbalance_ratio': imbalance_ratio,
         'class_counts': dict(class_counts)
     }
 
 
+def get_class_counts_from_db() -> dict:
+    """
+    Count labelled products per class without transferring the rows
+    
+    Returns:
+        dict: Mapping of prdtypecode to number of products
+    """
+    with pooled_connection() as conn:
+        cursor = conn.cursor()
+        
+        try:
+            cursor.execute("""
+                SELECT l.prdtypecode, COUNT(*)
+                FROM products p
+                JOIN labels l ON p.productid = l.productid
+                GROUP BY l.prdtypecode
+            """)
+            return {code: count for code, count in cursor.fetchall()}
+        
+        finally:
+            cursor.close()
+
+
+def get_undersampled_data_from_db(per_class: int) -> pd.DataFrame:
+    """
+    Sample `per_class` products of every class inside PostgreSQL
+    
+    Rows are ranked per class by a seeded hash of productid, so the sample is
+    reproducible and only the balanced subset crosses the wire. Results are
+    streamed through a server-side cursor.
+    
+    Args:
+        per_class: Number of samples to keep per class
+        
+    Returns:
+        pd.DataFrame: Balanced dataset with features and labels
+    """
+    columns = ['productid', 'designation', 'description', 'imageid', 'image_path', 'prdtypecode']
+    with pooled_connection() as conn:
+        cursor = conn.cursor(name='balanced_sample')
+        cursor.itersize = 10_000
+        
+        try:
+            cursor.execute("""
+                WITH ranked AS (
+                    SELECT
+                        p.productid,
+                        p.designation,
+                        p.description,
+                        p.imageid,
+                        p.image_path,
+                        l.prdtypecode,
+                        ROW_NUMBER() OVER (
+                            PARTITION BY l.prdtypecode
+                            ORDER BY md5(p.productid::text || %s)
+                        ) AS rn
+                    FROM products p
+                    JOIN labels l ON p.productid = l.productid
+                )
+                SELECT productid, designation, description, imageid, image_path, prdtypecode
+                FROM ranked
+                WHERE rn <= %s
+                ORDER BY prdtypecode, rn
+            """, (str(PIPELINE_CONFIG['random_seed']), per_class))
+            
+            return pd.DataFrame(list(cursor), columns=columns)
+        
+        finally:
+            cursor.close()
+
+
 def plot_class_distribution(class_counts: dict, title: str, output_path: Path):
     """
     Create visualization of class distribution
@@ -138,76 +320,132 @@ def plot_class_distribution(class_counts: dict, title: str, output_path: Path):
         title: Plot title
         output_path: Path to save plot
     """
-    plt.figure(figsize=(12, 6))
+    # Standalone Figure (no pyplot global state), safe to draw from a worker thread.
+    # Constrained layout is solved during the savefig draw itself, whereas
+    # tight_layout() and bbox_inches='tight' each render the figure once more.
+    fig = Figure(figsize=(12, 6), layout='constrained')
+    ax = fig.subplots()
     
     classes = sorted(class_counts.keys())
     counts = [class_counts[c] for c in classes]
     
-    plt.bar(range(len(classes)), counts)
-    plt.xlabel('Product Type Code')
-    plt.ylabel('Count')
-    plt.title(title)
-    plt.xticks(range(len(classes)), classes, rotation=45)
-    plt.tight_layout()
+    ax.bar(range(len(classes)), counts)
+    ax.set_xlabel('Product Type Code')
+    ax.set_ylabel('Count')
+    ax.set_title(title)
+    ax.set_xticks(range(len(classes)), classes, rotation=45)
     
-    plt.savefig(output_path, dpi=150, bbox_inches='tight')
-    plt.close()
+    fig.savefig(output_path, dpi=100)
     
     logger.info(f"Saved class distribution plot: {output_path}")
 
 
+def random_oversample_indices(y: np.ndarray, seed: int) -> np.ndarray:
+    """
+    Row indices that balance every class up to the majority class size
+    
+    Same scheme as imblearn's RandomOverSampler: all original rows are kept,
+    then each minority class gets (max_count - count) extra rows drawn with
+    replacement. Only integer indices are handled, so the feature columns
+    are never copied or validated.
+    
+    Args:
+        y: Class label per row
+        seed: Random seed
+        
+    Returns:
+        np.ndarray: Indices into y (originals first, then the extra draws)
+    """
+    rng = np.random.default_rng(seed)
+    classes, inverse, counts = np.unique(y, return_inverse=True, return_counts=True)
+    max_count = counts.max()
+    
+    # Row positions grouped by class (stable, so groups keep row order)
+    order = np.argsort(inverse, kind='stable')
+    groups = np.split(order, np.cumsum(counts)[:-1])
+    
+    extra = [
+        rng.choice(rows, max_count - len(rows), replace=True)
+        for rows in groups
+        if len(rows) < max_count
+    ]
+    return np.concatenate([np.arange(len(y))] + extra)
+
+
 def generate_balanced_dataset(strategy: str = 'random_oversampling'):
     """
     Generate balanced dataset using specified strategy
     
     Args:
-        strategy: Balancing strategy (currently only 'random_oversampling')
+        strategy: Balancing strategy ('random_oversampling', or
+            'random_undersampling' which samples inside PostgreSQL)
         
     Returns:
         tuple: (balanced_df, week_number, metadata)
     """
-    # Get current data
-    df = get_current_data_from_db()
-    
-    if len(df) == 0:
-        logger.error("No data in database")
+    if strategy not in ('random_oversampling', 'random_undersampling'):
+        logger.error(f"Unknown balancing strategy: {strategy}")
         return None, None, None
     
-    # Get current percentage and week
-    percentage, batch_name = get_current_percentage()
-    week_number = int((percentage - PIPELINE_CONFIG['initial_percentage']) / PIPELINE_CONFIG['increment_percentage']) + 1
-    
-    logger.info(f"Generating balanced dataset for week {week_number} ({percentage}% data)")
-    
-    # Analyze original distribution
-    original_stats = analyze_class_distribution(df, "Original Distribution")
+    # Data (or class counts) and current percentage are independent reads:
+    # fetch them concurrently so the short query hides behind the long one
+    load_source = get_class_counts_from_db if strategy == 'random_undersampling' else get_current_data_from_db
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        source_future = executor.submit(load_source)
+        percentage_future = executor.submit(get_current_percentage)
+        source = source_future.result()
+        percentage, batch_name = percentage_future.result()
     
-    # Prepare features and target
-    X = df[['productid', 'designation', 'description', 'imageid', 'image_path']]
-    y = df['prdtypecode']
+    # Get current week
+    week_number = int((percentage - PIPELINE_CONFIG['initial_percentage']) / PIPELINE_CONFIG['increment_percentage']) + 1
     
-    # Apply random oversampling
-    if strategy == 'random_oversampling':
-        logger.info("Applying random oversampling...")
+    if strategy == 'random_undersampling':
+        # Balance inside PostgreSQL: only N_classes x min_class rows are fetched
+        class_counts = source
         
-        ros = RandomOverSampler(random_state=PIPELINE_CONFIG['random_seed'])
-        X_resampled, y_resampled = ros.fit_resample(X, y)
+        if not class_counts:
+            logger.error("No data in database")
+            return None, None, None
         
-        # Reconstruct DataFrame
-        df_balanced = X_resampled.copy()
-        df_balanced['prdtypecode'] = y_resampled
+        logger.info(f"Generating balanced dataset for week {week_number} ({percentage}% data)")
+        original_stats = summarize_class_counts(class_counts, "Original Distribution")
         
-        logger.info(f"Original size: {len(df)} → Balanced size: {len(df_balanced)}")
+        logger.info("Applying random undersampling in PostgreSQL...")
+        df_balanced = get_undersampled_data_from_db(original_stats['min_class_size'])
+        original_size = original_stats['total_samples']
+        
+        logger.info(f"Original size: {original_size} → Balanced size: {len(df_balanced)}")
     else:
-        logger.error(f"Unknown balancing strategy: {strategy}")
-        return None, None, None
+        # Get current data
+        df = source
+        
+        if len(df) == 0:
+            logger.error("No data in database")
+            return None, None, None
+        
+        logger.info(f"Generating balanced dataset for week {week_number} ({percentage}% data)")
+        
+        # Analyze original distribution
+        original_stats = analyze_class_distribution(df, "Original Distribution")
+        original_size = len(df)
+        
+        # Apply random oversampling on row indices, then gather rows once
+        logger.info("Applying random oversampling...")
+        
+        indices = random_oversample_indices(
+            df['prdtypecode'].to_numpy(),
+            PIPELINE_CONFIG['random_seed']
+        )
+        columns = ['productid', 'designation', 'description', 'imageid', 'image_path', 'prdtypecode']
+        df_balanced = df[columns].iloc[indices].reset_index(drop=True)
+        
+        logger.info(f"Original size: {len(df)} → Balanced size: {len(df_balanced)}")
     
     # Analyze balanced distribution
     balanced_stats = analyze_class_distribution(df_balanced, "Balanced Distribution")
     
     # Verify balance
-    class_counts_balanced = Counter(df_balanced['prdtypecode'])
-    unique_counts = set(class_counts_balanced.values())
+    unique_counts = set(balanced_stats['class_counts'].values())
     
     if len(unique_counts) == 1:
         logger.info("✅ Perfect balance achieved!")
@@ -220,7 +458,7 @@ def generate_balanced_dataset(strategy: str = 'random_oversampling'):
         'percentage': percentage,
         'batch_name': batch_name,
         'strategy': strategy,
-        'original_size': len(df),
+        'original_size': original_size,
         'balanced_size': len(df_balanced),
         'original_stats': original_stats,
         'balanced_stats': balanced_stats,
@@ -244,7 +482,25 @@ def save_and_log_dataset(df_balanced: pd.DataFrame, week_number: int, metadata:
     
     # Save as parquet
     output_file = TRAINING_SNAPSHOTS_PATH / f"train_week_{week_number}.parquet"
-    df_balanced.to_parquet(output_file, index=False)
+    # pandas -> Arrow conversion runs one column per thread (the object
+    # string columns dominate); the Parquet encoder itself is sequential
+    table = pa.Table.from_pandas(
+        df_balanced, preserve_index=False, nthreads=os.cpu_count()
+    )
+    
+    # ZSTD + dictionary encoding for the repetitive columns only: the
+    # free-text designation/description would overflow the dictionary
+    pq.write_table(
+        table,
+        output_file,
+        compression='zstd',
+        compression_level=3,
+        row_group_size=500_000,
+        use_dictionary=['productid', 'imageid', 'image_path', 'prdtypecode'],
+        data_page_size=1 << 20,
+        write_batch_size=65536
+    )
+    del table
     logger.info(f"Saved dataset to: {output_file}")
     
     # Set MLflow tracking URI
@@ -276,44 +532,62 @@ def save_and_log_dataset(df_balanced: pd.DataFrame, week_number: int, metadata:
         mlflow.log_metric("imbalance_ratio_before", metadata['original_stats']['imbalance_ratio'])
         mlflow.log_metric("imbalance_ratio_after", metadata['balanced_stats']['imbalance_ratio'])
         
-        # Log class counts as metrics
-        for class_code, count in metadata['balanced_stats']['class_counts'].items():
-            mlflow.log_metric(f"class_{class_code}_count", count)
+        # Log class counts as metrics (one batched request)
+        mlflow.log_metrics({
+            f"class_{class_code}_count": count
+            for class_code, count in metadata['balanced_stats']['class_counts'].items()
+        })
         
-        # Create and log class distribution plots
+        run_id = mlflow.active_run().info.run_id
+        
+        # Uploads overlap with each other and with plotting. Workers log
+        # through the client with an explicit run_id, since the fluent
+        # active run is not visible from other threads.
+        client = get_client()
         plot_before_path = TRAINING_SNAPSHOTS_PATH / f"week_{week_number}_distribution_before.png"
         plot_after_path = TRAINING_SNAPSHOTS_PATH / f"week_{week_number}_distribution_after.png"
-        
-        plot_class_distribution(
-            metadata['original_stats']['class_counts'],
-            f"Week {week_number} - Before Balancing",
-            plot_before_path
-        )
-        
-        plot_class_distribution(
-            metadata['balanced_stats']['class_counts'],
-            f"Week {week_number} - After Balancing",
-            plot_after_path
-        )
-        
-        mlflow.log_artifact(str(plot_before_path))
-        mlflow.log_artifact(str(plot_after_path))
-        
-        # Save and log metadata as JSON
         metadata_file = TRAINING_SNAPSHOTS_PATH / f"week_{week_number}_metadata.json"
-        with open(metadata_file, 'w') as f:
-            json.dump(metadata, f, indent=2)
-        mlflow.log_artifact(str(metadata_file))
         
-        # Log dataset parquet file
-        mlflow.log_artifact(str(output_file))
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            # Dataset parquet file first: by far the largest upload
+            uploads = [executor.submit(client.log_artifact, run_id, str(output_file))]
+            
+            # Create class distribution plots
+            plots = {
+                plot_before_path: executor.submit(
+                    plot_class_distribution,
+                    metadata['original_stats']['class_counts'],
+                    f"Week {week_number} - Before Balancing",
+                    plot_before_path
+                ),
+                plot_after_path: executor.submit(
+                    plot_class_distribution,
+                    metadata['balanced_stats']['class_counts'],
+                    f"Week {week_number} - After Balancing",
+                    plot_after_path
+                ),
+            }
+            
+            # Save and log metadata as JSON
+            metadata_file.write_bytes(orjson.dumps(
+                metadata,
+                option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+            ))
+            uploads.append(executor.submit(client.log_artifact, run_id, str(metadata_file)))
+            
+            for plot_path, plot in plots.items():
+                plot.result()
+                uploads.append(executor.submit(client.log_artifact, run_id, str(plot_path)))
+            
+            # Re-raise the first upload failure, if any
+            for upload in uploads:
+                upload.result()
         
         # Log tags
         mlflow.set_tag("dataset_type", "training")
         mlflow.set_tag("week", week_number)
         mlflow.set_tag("percentage", f"{metadata['percentage']}%")
         
-        run_id = mlflow.active_run().info.run_id
         logger.info(f"✅ Logged dataset to MLflow (run_id: {run_id})")
         
         return run_id
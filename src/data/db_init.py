@@ -2,11 +2,10 @@
 Database Initialization Script
 Initializes the PostgreSQL database and loads initial 40% of training data
 """
+import re
 import sys
 from pathlib import Path
-import pandas as pd
 import psycopg2
-from psycopg2.extras import execute_values
 from sqlalchemy import create_engine, text
 import logging
 
@@ -19,6 +18,8 @@ from src.config import (
     DATA_FILES,
     PIPELINE_CONFIG,
 )
+from src.data.bulk import copy_insert_ignore_conflicts
+from src.data.loader import image_paths, read_training_data
 
 # Configure logging
 logging.basicConfig(
@@ -27,6 +28,9 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# schema.sql lines that only make sense under psql
+PSQL_ONLY_LINES = re.compile(r'^\s*(CREATE DATABASE\b|\\[cd]).*$', re.MULTILINE | re.IGNORECASE)
+
 
 def create_databases():
     """Create necessary databases if they don't exist"""
@@ -75,29 +79,37 @@ def initialize_schema():
     with open(schema_file, 'r') as f:
         schema_sql = f.read()
     
-    # Execute schema (skip CREATE DATABASE commands as we already did that)
-    engine = create_engine(DATABASE_URL)
+    # Skip CREATE DATABASE (already done) and psql meta-commands
+    schema_sql = PSQL_ONLY_LINES.sub('', schema_sql)
     
-    # Split by statements and execute (excluding CREATE DATABASE statements)
-    statements = [s.strip() for s in schema_sql.split(';') if s.strip()]
+    engine = create_engine(DATABASE_URL, executemany_mode='values_plus_batch')
     
-    with engine.connect() as conn:
-        for statement in statements:
-            # Skip CREATE DATABASE and \c commands
-            if statement.startswith('CREATE DATABASE') or statement.startswith('\\c') or statement.startswith('\\d'):
-                continue
-            
-            if statement:
-                try:
-                    conn.execute(text(statement))
-                    conn.commit()
-                except Exception as e:
-                    logger.warning(f"Error executing statement (may be normal): {e}")
+    # Whole file as one multi-statement string: one round-trip, one
+    # transaction, and the $$-quoted function body is sent intact
+    try:
+        with engine.begin() as conn:
+            conn.execution_options(no_parameters=True).exec_driver_sql(schema_sql)
+    except Exception as e:
+        logger.warning(f"Schema batch failed ({e}), retrying statement by statement")
+        _execute_statements(engine, schema_sql)
     
     logger.info("Schema initialized successfully")
     return True
 
 
+def _execute_statements(engine, schema_sql: str):
+    """Execute schema statements one by one, logging (not raising) failures"""
+    statements = [s.strip() for s in schema_sql.split(';') if s.strip()]
+    
+    with engine.connect() as conn:
+        for statement in statements:
+            try:
+                conn.execute(text(statement))
+                conn.commit()
+            except Exception as e:
+                logger.warning(f"Error executing statement (may be normal): {e}")
+
+
 def load_initial_data(percentage: float = None):
     """
     Load initial percentage of training data into database
@@ -118,11 +130,7 @@ def load_initial_data(percentage: float = None):
     
     # Read data files
     logger.info("Reading CSV files...")
-    x_train = pd.read_csv(DATA_FILES['x_train'], index_col=0)
-    y_train = pd.read_csv(DATA_FILES['y_train'], index_col=0)
-    
-    # Merge datasets on index
-    df = x_train.join(y_train, how='inner')
+    df = read_training_data()
     
     total_rows = len(df)
     target_rows = int(total_rows * percentage / 100)
@@ -137,10 +145,7 @@ def load_initial_data(percentage: float = None):
     ).reset_index(drop=True)
     
     # Add image paths
-    images_dir = DATA_FILES['images_dir']
-    df_sample['image_path'] = df_sample['imageid'].apply(
-        lambda img_id: f"images/image_train/image_{img_id}_product_{df_sample[df_sample['imageid'] == img_id]['productid'].iloc[0] if len(df_sample[df_sample['imageid'] == img_id]) > 0 else 0}.jpg"
-    )
+    df_sample['image_path'] = image_paths(df_sample)
     
     # Connect to database
     conn = psycopg2.connect(**POSTGRES_CONFIG)
@@ -166,48 +171,28 @@ def load_initial_data(percentage: float = None):
         logger.info(f"Created batch record with ID: {batch_id}")
         
         # Insert products
-        logger.info("Inserting products...")
-        products_data = [
-            (
-                row['designation'],
-                row['description'],
-                row['productid'],
-                row['imageid'],
-                row['image_path']
-            )
-            for _, row in df_sample.iterrows()
-        ]
-        
-        execute_values(
+        logger.info("Copying products...")
+        products_inserted = copy_insert_ignore_conflicts(
             cursor,
-            """
-            INSERT INTO products (designation, description, productid, imageid, image_path)
-            VALUES %s
-            ON CONFLICT (productid) DO NOTHING
-            """,
-            products_data
+            df_sample,
+            'products',
+            ['designation', 'description', 'productid', 'imageid', 'image_path'],
+            conflict_column='productid'
         )
         
-        logger.info(f"Inserted {len(products_data)} products")
+        logger.info(f"Inserted {products_inserted} products")
         
         # Insert labels
-        logger.info("Inserting labels...")
-        labels_data = [
-            (row['productid'], row['prdtypecode'])
-            for _, row in df_sample.iterrows()
-        ]
-        
-        execute_values(
+        logger.info("Copying labels...")
+        labels_inserted = copy_insert_ignore_conflicts(
             cursor,
-            """
-            INSERT INTO labels (productid, prdtypecode)
-            VALUES %s
-            ON CONFLICT (productid) DO NOTHING
-            """,
-            labels_data
+            df_sample,
+            'labels',
+            ['productid', 'prdtypecode'],
+            conflict_column='productid'
         )
         
-        logger.info(f"Inserted {len(labels_data)} labels")
+        logger.info(f"Inserted {labels_inserted} labels")
         
         # Complete batch
         cursor.execute("""
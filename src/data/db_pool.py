@@ -0,0 +1,63 @@
+"""
+PostgreSQL Connection Pool
+Process-wide psycopg2 pool so repeated queries from the same worker reuse an
+open connection instead of paying the connect/auth handshake every time
+"""
+import sys
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+from psycopg2.pool import ThreadedConnectionPool
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from src.config import POSTGRES_CONFIG, POSTGRES_POOL_CONFIG
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ThreadedConnectionPool:
+    """
+    Get the shared connection pool, creating it on first use
+
+    Returns:
+        ThreadedConnectionPool bound to POSTGRES_CONFIG
+    """
+    global _pool
+
+    if _pool is None or _pool.closed:
+        with _pool_lock:
+            if _pool is None or _pool.closed:
+                _pool = ThreadedConnectionPool(
+                    POSTGRES_POOL_CONFIG['minconn'],
+                    POSTGRES_POOL_CONFIG['maxconn'],
+                    **POSTGRES_CONFIG
+                )
+    return _pool
+
+
+@contextmanager
+def pooled_connection():
+    """
+    Borrow a connection from the shared pool
+
+    Any transaction left open by the caller is rolled back before the
+    connection is handed back, so the next borrower always gets an idle one.
+
+    Yields:
+        psycopg2 connection
+    """
+    pool = get_pool()
+    conn = pool.getconn()
+
+    try:
+        yield conn
+    finally:
+        if conn.closed:
+            pool.putconn(conn, close=True)
+        else:
+            conn.rollback()
+            pool.putconn(conn)
@@ -2,12 +2,15 @@
 Incremental Data Loader
 Loads data incrementally into PostgreSQL database following cumulative strategy
 """
+import os
 import sys
 from pathlib import Path
 from datetime import datetime
+import numpy as np
 import pandas as pd
-import psycopg2
-from psycopg2.extras import execute_values
+import pyarrow as pa
+import pyarrow.csv as pv
+import pyarrow.parquet as pq
 from sqlalchemy import create_engine, text
 import logging
 
@@ -15,11 +18,32 @@ import logging
 sys.path.append(str(Path(__file__).parent.parent.parent))
 
 from src.config import (
-    POSTGRES_CONFIG,
     DATABASE_URL,
     DATA_FILES,
     PIPELINE_CONFIG,
+    LOAD_MODE,
+    DATASET_CACHE_PATH,
 )
+from src.data.bulk import copy_insert_ignore_conflicts, insert_ignore_conflicts
+from src.data.db_pool import pooled_connection
+
+# Insert strategies selectable through LOAD_MODE
+LOADERS = {
+    'copy': copy_insert_ignore_conflicts,
+    'insert': insert_ignore_conflicts,
+}
+
+# Merged X_train/Y_train, cached under DATASET_CACHE_PATH
+MERGED_TRAIN_CACHE = 'merged_train.parquet'
+
+# Column types of X_train.csv / Y_train.csv (the index column is inferred)
+TRAINING_COLUMN_TYPES = {
+    'designation': pa.string(),
+    'description': pa.string(),
+    'productid': pa.int64(),
+    'imageid': pa.int64(),
+    'prdtypecode': pa.int64(),
+}
 
 # Configure logging
 logging.basicConfig(
@@ -36,36 +60,35 @@ def get_current_state():
     Returns:
         dict: Current state with percentage, total_rows, last_load_date
     """
-    conn = psycopg2.connect(**POSTGRES_CONFIG)
-    cursor = conn.cursor()
-    
-    try:
-        cursor.execute("""
-            SELECT percentage, total_rows, completed_at
-            FROM data_loads
-            WHERE status = 'completed'
-            ORDER BY percentage DESC
-            LIMIT 1
-        """)
+    with pooled_connection() as conn:
+        cursor = conn.cursor()
         
-        result = cursor.fetchone()
+        try:
+            cursor.execute("""
+                SELECT percentage, total_rows, completed_at
+                FROM data_loads
+                WHERE status = 'completed'
+                ORDER BY percentage DESC
+                LIMIT 1
+            """)
+            
+            result = cursor.fetchone()
+            
+            if result:
+                return {
+                    'current_percentage': float(result[0]),
+                    'total_rows': result[1],
+                    'last_load_date': result[2]
+                }
+            else:
+                return {
+                    'current_percentage': 0,
+                    'total_rows': 0,
+                    'last_load_date': None
+                }
         
-        if result:
-            return {
-                'current_percentage': float(result[0]),
-                'total_rows': result[1],
-                'last_load_date': result[2]
-            }
-        else:
-            return {
-                'current_percentage': 0,
-                'total_rows': 0,
-                'last_load_date': None
-            }
-    
-    finally:
-        cursor.close()
-        conn.close()
+        finally:
+            cursor.close()
 
 
 def calculate_next_percentage(current_percentage: float) -> float:
@@ -82,16 +105,88 @@ def calculate_next_percentage(current_percentage: float) -> float:
     return min(next_pct, PIPELINE_CONFIG['max_percentage'])
 
 
-def load_incremental_data(target_percentage: float = None):
+def read_training_data() -> pd.DataFrame:
+    """
+    Read X_train / Y_train and merge them on index
+    
+    Both files go through Arrow's multi-threaded CSV reader with explicit
+    column types, so nothing is re-inferred and text is decoded in C++.
+    Rows keep file order, which keeps df.sample() reproducible.
+    
+    The merged frame is cached as Parquet under DATASET_CACHE_PATH and
+    reused for as long as it is newer than both CSVs.
+    
+    Returns:
+        pd.DataFrame: Features joined with labels
+    """
+    cache_file = DATASET_CACHE_PATH / MERGED_TRAIN_CACHE
+    csv_mtime = max(DATA_FILES['x_train'].stat().st_mtime, DATA_FILES['y_train'].stat().st_mtime)
+    try:
+        if cache_file.stat().st_mtime > csv_mtime:
+            df = pq.read_table(cache_file, memory_map=True).to_pandas(self_destruct=True)
+            logger.info(f"Loaded {len(df)} merged training rows from cache: {cache_file}")
+            return df
+    except FileNotFoundError:
+        pass
+    
+    x_train = _read_indexed_csv(DATA_FILES['x_train'])
+    y_train = _read_indexed_csv(DATA_FILES['y_train'])
+    
+    # Merge datasets on index
+    df = x_train.join(y_train, how='inner')
+    
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = cache_file.with_suffix('.tmp')
+        pq.write_table(pa.Table.from_pandas(df), tmp_file, compression='zstd')
+        os.replace(tmp_file, cache_file)
+    except Exception as e:
+        logger.warning(f"Failed to cache merged training data: {e}")
+    
+    return df
+
+
+def image_paths(df: pd.DataFrame) -> pd.Series:
+    """Relative image path per row, built with vectorized string concatenation"""
+    return (
+        'images/image_train/image_' + df['imageid'].astype(str)
+        + '_product_' + df['productid'].astype(str) + '.jpg'
+    )
+
+
+def _read_indexed_csv(path: Path) -> pd.DataFrame:
+    """Read a raw training CSV whose first (unnamed) column is the index"""
+    table = pv.read_csv(
+        path,
+        # Descriptions may hold quoted newlines
+        parse_options=pv.ParseOptions(newlines_in_values=True),
+        convert_options=pv.ConvertOptions(
+            column_types=TRAINING_COLUMN_TYPES,
+            strings_can_be_null=True,
+        ),
+    )
+    df = table.to_pandas(self_destruct=True)
+    df = df.set_index(df.columns[0])
+    df.index.name = None
+    return df
+
+
+def load_incremental_data(target_percentage: float = None, mode: str = None):
     """
     Load data incrementally up to target percentage (cumulative strategy)
     
     Args:
         target_percentage: Target percentage to reach (if None, uses next increment)
+        mode: 'copy' or 'insert' (if None, uses LOAD_MODE)
         
     Returns:
         bool: Success status
     """
+    mode = mode or LOAD_MODE
+    if mode not in LOADERS:
+        raise ValueError(f"Unknown load mode: {mode} (expected one of {list(LOADERS)})")
+    insert_rows = LOADERS[mode]
+    
     # Get current state
     state = get_current_state()
     current_pct = state['current_percentage']
@@ -121,11 +216,7 @@ def load_incremental_data(target_percentage: float = None):
     
     # Read data files
     logger.info("Reading CSV files...")
-    x_train = pd.read_csv(DATA_FILES['x_train'], index_col=0)
-    y_train = pd.read_csv(DATA_FILES['y_train'], index_col=0)
-    
-    # Merge datasets on index
-    df = x_train.join(y_train, how='inner')
+    df = read_training_data()
     
     total_rows = len(df)
     target_rows = int(total_rows * target_percentage / 100)
@@ -133,182 +224,162 @@ def load_incremental_data(target_percentage: float = None):
     logger.info(f"Total available rows: {total_rows}")
     logger.info(f"Target rows ({target_percentage}%): {target_rows}")
     
-    # Deterministic sampling (cumulative: always sample from full dataset)
-    df_sample = df.sample(
-        n=target_rows,
-        random_state=PIPELINE_CONFIG['random_seed']
-    ).reset_index(drop=True)
+    # Deterministic sampling (cumulative: always sample from full dataset).
+    # This is the seeded permutation df.sample(n, random_state=seed) draws
+    # from, so every load is a prefix of the next one. Slicing the positions
+    # directly only copies the rows past the previous load.
+    loaded_rows = min(state['total_rows'] or 0, target_rows)
+    order = np.random.RandomState(PIPELINE_CONFIG['random_seed']).permutation(len(df))
+    df_new = df.iloc[order[loaded_rows:target_rows]]
     
-    # Add image paths
-    df_sample['image_path'] = df_sample.apply(
-        lambda row: f"images/image_train/image_{row['imageid']}_product_{row['productid']}.jpg",
-        axis=1
-    )
+    # Insert in key order: unique-index entries append to the rightmost
+    # B-tree leaf instead of splitting pages across the whole index
+    df_new = df_new.sort_values('productid', kind='mergesort').reset_index(drop=True)
     
-    # Connect to database
-    conn = psycopg2.connect(**POSTGRES_CONFIG)
-    cursor = conn.cursor()
-    
-    batch_name = f'week_{int((target_percentage - PIPELINE_CONFIG["initial_percentage"]) / PIPELINE_CONFIG["increment_percentage"]) + 1}'
+    # Add image paths
+    df_new['image_path'] = image_paths(df_new)
     
-    try:
-        # Start batch tracking
-        import json
-        cursor.execute("""
-            INSERT INTO data_loads (batch_name, percentage, total_rows, status, metadata)
-            VALUES (%s, %s, %s, %s, %s::jsonb)
-            RETURNING id
-        """, (
-            batch_name,
-            target_percentage,
-            target_rows,
-            'running',
-            json.dumps({
-                'type': 'incremental_load',
-                'previous_percentage': current_pct,
-                'increment': target_percentage - current_pct
-            })
-        ))
-        batch_id = cursor.fetchone()[0]
-        conn.commit()
-        
-        logger.info(f"Created batch record: {batch_name} (ID: {batch_id})")
-        
-        # Get existing product IDs to avoid duplicates
-        cursor.execute("SELECT productid FROM products")
-        existing_ids = set(row[0] for row in cursor.fetchall())
+    # Borrow a connection from the shared pool
+    with pooled_connection() as conn:
+        cursor = conn.cursor()
         
-        # Filter out existing products
-        df_new = df_sample[~df_sample['productid'].isin(existing_ids)]
+        batch_name = f'week_{int((target_percentage - PIPELINE_CONFIG["initial_percentage"]) / PIPELINE_CONFIG["increment_percentage"]) + 1}'
         
-        logger.info(f"New products to insert: {len(df_new)}")
-        
-        if len(df_new) > 0:
-            # Insert products
-            logger.info("Inserting new products...")
-            products_data = [
-                (
-                    row['designation'],
-                    row['description'],
-                    row['productid'],
-                    row['imageid'],
-                    row['image_path']
-                )
-                for _, row in df_new.iterrows()
-            ]
-            
-            execute_values(
-                cursor,
-                """
-                INSERT INTO products (designation, description, productid, imageid, image_path)
-                VALUES %s
-                ON CONFLICT (productid) DO NOTHING
-                """,
-                products_data
-            )
+        try:
+            # Start batch tracking
+            import json
+            cursor.execute("""
+                INSERT INTO data_loads (batch_name, percentage, total_rows, status, metadata)
+                VALUES (%s, %s, %s, %s, %s::jsonb)
+                RETURNING id
+            """, (
+                batch_name,
+                target_percentage,
+                target_rows,
+                'running',
+                json.dumps({
+                    'type': 'incremental_load',
+                    'previous_percentage': current_pct,
+                    'increment': target_percentage - current_pct
+                })
+            ))
+            batch_id = cursor.fetchone()[0]
+            conn.commit()
             
-            logger.info(f"Inserted {len(products_data)} products")
+            logger.info(f"Created batch record: {batch_name} (ID: {batch_id})")
             
-            # Insert labels
-            logger.info("Inserting labels...")
-            labels_data = [
-                (row['productid'], row['prdtypecode'])
-                for _, row in df_new.iterrows()
-            ]
+            # Rows already present (e.g. after a failed batch) are skipped by
+            # the ON CONFLICT insert, no need to fetch the existing IDs
+            logger.info(f"New products to insert: {len(df_new)} (rows {loaded_rows}-{target_rows})")
             
-            execute_values(
-                cursor,
-                """
-                INSERT INTO labels (productid, prdtypecode)
-                VALUES %s
-                ON CONFLICT (productid) DO NOTHING
-                """,
-                labels_data
-            )
+            products_inserted = 0
+            if len(df_new) > 0:
+                # Bulk load: let the commit return without waiting for the WAL fsync
+                cursor.execute("SET LOCAL synchronous_commit = OFF")
+
+                # Insert products
+                logger.info(f"Loading new products ({mode})...")
+                products_inserted = insert_rows(
+                    cursor,
+                    df_new,
+                    'products',
+                    ['designation', 'description', 'productid', 'imageid', 'image_path'],
+                    conflict_column='productid'
+                )
+                
+                logger.info(f"Inserted {products_inserted} products")
+                
+                # Insert labels
+                logger.info(f"Loading labels ({mode})...")
+                labels_inserted = insert_rows(
+                    cursor,
+                    df_new,
+                    'labels',
+                    ['productid', 'prdtypecode'],
+                    conflict_column='productid'
+                )
+                
+                logger.info(f"Inserted {labels_inserted} labels")
             
-            logger.info(f"Inserted {len(labels_data)} labels")
-        
-        # Complete batch
-        cursor.execute("""
-            UPDATE data_loads
-            SET status = 'completed', completed_at = NOW()
-            WHERE id = %s
-        """, (batch_id,))
-        
-        conn.commit()
-        
-        logger.info("✅ Incremental data load completed successfully!")
-        
-        # Print summary
-        cursor.execute("SELECT COUNT(*) FROM products")
-        products_count = cursor.fetchone()[0]
-        
-        cursor.execute("SELECT COUNT(DISTINCT prdtypecode) FROM labels")
-        classes_count = cursor.fetchone()[0]
-        
-        logger.info(f"\n📊 Database Summary:")
-        logger.info(f"  - Products: {products_count}")
-        logger.info(f"  - Classes: {classes_count}")
-        logger.info(f"  - Percentage loaded: {target_percentage}%")
-        logger.info(f"  - New products added: {len(df_new)}")
-        
-        return True
-        
-    except Exception as e:
-        logger.error(f"Error loading data: {e}")
-        conn.rollback()
-        # Mark batch as failed
-        try:
+            # Complete batch and fetch summary counts in the same round-trip
+            # (psycopg2 sends both statements in one message; fetchone() reads
+            # the result of the last one)
             cursor.execute("""
                 UPDATE data_loads
-                SET status = 'failed'
-                WHERE batch_name = %s
-            """, (batch_name,))
+                SET status = 'completed', completed_at = NOW()
+                WHERE id = %s;
+                SELECT
+                    (SELECT COUNT(*) FROM products),
+                    (SELECT COUNT(DISTINCT prdtypecode) FROM labels)
+            """, (batch_id,))
+            products_count, classes_count = cursor.fetchone()
+            
             conn.commit()
-        except:
-            pass
-        return False
-        
-    finally:
-        cursor.close()
-        conn.close()
+            
+            logger.info("✅ Incremental data load completed successfully!")
+            
+            # Print summary
+            logger.info(f"\n📊 Database Summary:")
+            logger.info(f"  - Products: {products_count}")
+            logger.info(f"  - Classes: {classes_count}")
+            logger.info(f"  - Percentage loaded: {target_percentage}%")
+            logger.info(f"  - New products added: {products_inserted}")
+            
+            return True
+            
+        except Exception as e:
+            logger.error(f"Error loading data: {e}")
+            conn.rollback()
+            # Mark batch as failed
+            try:
+                cursor.execute("""
+                    UPDATE data_loads
+                    SET status = 'failed'
+                    WHERE batch_name = %s
+                """, (batch_name,))
+                conn.commit()
+            except:
+                pass
+            return False
+            
+        finally:
+            cursor.close()
 
 
 def get_load_history():
     """Get history of all data loads"""
-    conn = psycopg2.connect(**POSTGRES_CONFIG)
-    cursor = conn.cursor()
-    
-    try:
-        cursor.execute("""
-            SELECT 
-                batch_name,
-                percentage,
-                total_rows,
-                started_at,
-                completed_at,
-                status,
-                metadata
-            FROM data_loads
-            ORDER BY started_at ASC
-        """)
-        
-        results = cursor.fetchall()
+    with pooled_connection() as conn:
+        cursor = conn.cursor()
         
-        print("\n📜 Data Load History:")
-        print("-" * 100)
-        print(f"{'Batch':<20} {'%':<8} {'Rows':<10} {'Started':<20} {'Status':<12}")
-        print("-" * 100)
-        
-        for row in results:
-            batch_name, pct, rows, started, completed, status, metadata = row
-            print(f"{batch_name:<20} {pct:<8.1f} {rows:<10} {started.strftime('%Y-%m-%d %H:%M'):<20} {status:<12}")
-        
-        print("-" * 100)
-        
-    finally:
-        cursor.close()
-        conn.close()
+        try:
+            cursor.execute("""
+                SELECT 
+                    batch_name,
+                    percentage,
+                    total_rows,
+                    started_at,
+                    completed_at,
+                    status,
+                    metadata
+                FROM data_loads
+                ORDER BY started_at ASC
+            """)
+            
+            results = cursor.fetchall()
+            
+            print("\n📜 Data Load History:")
+            print("-" * 100)
+            print(f"{'Batch':<20} {'%':<8} {'Rows':<10} {'Started':<20} {'Status':<12}")
+            print("-" * 100)
+            
+            for row in results:
+                batch_name, pct, rows, started, completed, status, metadata = row
+                print(f"{batch_name:<20} {pct:<8.1f} {rows:<10} {started.strftime('%Y-%m-%d %H:%M'):<20} {status:<12}")
+            
+            print("-" * 100)
+            
+        finally:
+            cursor.close()
 
 
 def main():
@@ -319,6 +390,7 @@ def main():
     parser.add_argument('--percentage', type=float, help='Target percentage to load')
     parser.add_argument('--status', action='store_true', help='Show current status')
     parser.add_argument('--history', action='store_true', help='Show load history')
+    parser.add_argument('--mode', choices=list(LOADERS), help='Load mode (default: LOAD_MODE)')
     
     args = parser.parse_args()
     
@@ -336,7 +408,7 @@ def main():
         return
     
     # Load data
-    success = load_incremental_data(args.percentage)
+    success = load_incremental_data(args.percentage, mode=args.mode)
     sys.exit(0 if success else 1)
 
 
@@ -2,16 +2,53 @@
 Export module:
     Export processed_products to CSV file for DVC versioning.
     Output: /opt/airflow/data/processed/processed_products.csv
+            /opt/airflow/data/processed/processed_products.parquet
+    Downstream readers should use `read_export` (Parquet, column projection)
+    rather than re-parsing the CSV.
 """
 
 import logging
 import os
 
-import pandas as pd
 import psycopg2
+import pyarrow as pa
+import pyarrow.csv as pv
+import pyarrow.parquet as pq
 
 logger = logging.getLogger(__name__)
 
+EXPORT_DIR = "/opt/airflow/data/processed"
+EXPORT_PARQUET_PATH = os.path.join(EXPORT_DIR, "processed_products.parquet")
+
+# Only low-cardinality text is worth dictionary-encoding; the free-text
+# columns are near unique and would just fall back to plain pages.
+EXPORT_DICTIONARY_COLUMNS = ["prodtype", "batch_id"]
+EXPORT_ROW_GROUP_SIZE = 200_000
+
+EXPORT_QUERY = """
+    SELECT productid, imageid, prdtypecode, prodtype,
+           designation_tr, description_tr, text_tr,
+           path_image_minio, image_exists, batch_id, dt_processed
+    FROM processed_products
+    ORDER BY productid
+"""
+
+EXPORT_SCHEMA = pa.schema(
+    [
+        ("productid", pa.int64()),
+        ("imageid", pa.int64()),
+        ("prdtypecode", pa.int32()),
+        ("prodtype", pa.string()),
+        ("designation_tr", pa.string()),
+        ("description_tr", pa.string()),
+        ("text_tr", pa.string()),
+        ("path_image_minio", pa.string()),
+        ("image_exists", pa.bool_()),
+        ("batch_id", pa.string()),
+        ("dt_processed", pa.timestamp("us")),
+    ]
+)
+
 
 def get_pg_conn():
     """Create PostgreSQL connection using psycopg2."""
@@ -24,29 +61,82 @@ def get_pg_conn():
     )
 
 
+def copy_processed_products(conn, output_path: str):
+    """
+    Stream processed_products straight to a ';'-separated CSV file.
+
+    COPY TO STDOUT writes into the file as rows arrive, so no DataFrame is
+    built and memory stays flat whatever the table size.
+    """
+    cursor = conn.cursor()
+    with open(output_path, "wb") as f:
+        cursor.copy_expert(
+            f"COPY ({EXPORT_QUERY}) TO STDOUT WITH (FORMAT CSV, HEADER, DELIMITER ';')", f
+        )
+    cursor.close()
+
+
+def read_export_csv(path: str) -> pa.Table:
+    """
+    Parse a CSV written by copy_processed_products into an Arrow table.
+
+    Parsing happens in Arrow's C++ CSV reader, so no Python object is built
+    per value.
+    """
+    # COPY CSV writes NULL unquoted and empty strings as "", booleans as t/f
+    return pv.read_csv(
+        path,
+        # Free text may hold quoted newlines
+        parse_options=pv.ParseOptions(delimiter=";", newlines_in_values=True),
+        convert_options=pv.ConvertOptions(
+            column_types=EXPORT_SCHEMA,
+            true_values=["t"],
+            false_values=["f"],
+            null_values=[""],
+            strings_can_be_null=True,
+            quoted_strings_can_be_null=False,
+        ),
+    )
+
+
+def read_export(path: str = EXPORT_PARQUET_PATH, columns=None, filters=None) -> pa.Table:
+    """
+    Read the Parquet export as an Arrow table.
+
+    Only the requested columns are decoded, and `filters` (pyarrow
+    expression or DNF list, e.g. [("batch_id", "=", "b1")]) skip whole row
+    groups using their statistics.
+    """
+    return pq.read_table(path, columns=columns, filters=filters, memory_map=True)
+
+
 def run_export(**context) -> dict:
     """
-    Export all processed_products to CSV for DVC snapshot.
+    Export all processed_products to CSV (and Parquet) for DVC snapshot.
     """
-    output_dir = "/opt/airflow/data/processed"
-    os.makedirs(output_dir, exist_ok=True)
-    output_path = os.path.join(output_dir, "processed_products.csv")
+    os.makedirs(EXPORT_DIR, exist_ok=True)
+    output_path = os.path.join(EXPORT_DIR, "processed_products.csv")
+    parquet_path = EXPORT_PARQUET_PATH
 
     conn = get_pg_conn()
-    query = """
-        SELECT productid, imageid, prdtypecode, prodtype,
-               designation_tr, description_tr, text_tr,
-               path_image_minio, image_exists, batch_id, dt_processed
-        FROM processed_products
-        ORDER BY productid
-    """
-    df = pd.read_sql(query, conn)
-    conn.close()
+    try:
+        copy_processed_products(conn, output_path)
+    finally:
+        conn.close()
 
-    df.to_csv(output_path, index=False, sep=";")
-    logger.info(f"Exported {len(df)} rows to {output_path}")
+    # The Parquet copy is built from the file just written: one pass over the table
+    table = read_export_csv(output_path)
+    pq.write_table(
+        table,
+        parquet_path,
+        compression="zstd",
+        use_dictionary=EXPORT_DICTIONARY_COLUMNS,
+        row_group_size=EXPORT_ROW_GROUP_SIZE,
+    )
+    logger.info(f"Exported {table.num_rows} rows to {output_path} and {parquet_path}")
 
     context["ti"].xcom_push(key="export_path", value=output_path)
-    context["ti"].xcom_push(key="export_rows", value=len(df))
+    context["ti"].xcom_push(key="export_parquet_path", value=parquet_path)
+    context["ti"].xcom_push(key="export_rows", value=table.num_rows)
 
-    return {"path": output_path, "rows": len(df)}
+    return {"path": output_path, "parquet_path": parquet_path, "rows": table.num_rows}
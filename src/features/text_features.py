@@ -3,20 +3,45 @@ Text Feature Engineering
 
 TF-IDF feature extraction for product text (designation + description).
 """
-from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.feature_extraction.text import (
+    HashingVectorizer,
+    TfidfTransformer,
+    TfidfVectorizer,
+)
+from sklearn.pipeline import make_pipeline
+import hashlib
+import os
+import joblib
 import pandas as pd
 import numpy as np
+import sklearn
 import sys
 from pathlib import Path
 
 # Add parent to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
-from src.utils.text_preprocessing import clean_text, input_text_train, input_text_infer
+from src.utils.text_preprocessing import (
+    clean_text_series,
+    input_text_train,
+    input_text_infer,
+)
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Bump when _combine_texts output changes: invalidates every cached fit
+FIT_CACHE_VERSION = 1
+FIT_CACHE_KEEP = 3
+
+# lz4 is close to memcpy speed; fall back to zlib when it is not installed
+try:
+    import lz4  # noqa: F401
+
+    VECTORIZER_COMPRESS = ("lz4", 3)
+except ImportError:
+    VECTORIZER_COMPRESS = 3
+
 
 class TextFeatureExtractor:
     """
@@ -32,6 +57,8 @@ class TextFeatureExtractor:
         ngram_range: tuple = (1, 2),
         min_df: int = 2,
         max_df: float = 0.95,
+        hashing_features: int = None,
+        cache_dir: str = None,
     ):
         """
         Initialize feature extractor.
@@ -41,25 +68,48 @@ class TextFeatureExtractor:
             ngram_range: N-gram range (e.g., (1,2) for unigrams and bigrams)
             min_df: Minimum document frequency
             max_df: Maximum document frequency (proportion)
+            hashing_features: If set, hash tokens into this many columns
+                (HashingVectorizer + TfidfTransformer) instead of building a
+                vocabulary; max_features/min_df/max_df are then unused
+            cache_dir: If set, fit_transform results (fitted vectorizer and
+                feature matrix) are cached there, keyed by the input texts and
+                the parameters above
         """
         self.max_features = max_features
         self.ngram_range = ngram_range
         self.min_df = min_df
         self.max_df = max_df
+        self.hashing_features = hashing_features
+        self.cache_dir = Path(cache_dir) if cache_dir else None
 
-        self.vectorizer = TfidfVectorizer(
-            max_features=max_features,
-            ngram_range=ngram_range,
-            min_df=min_df,
-            max_df=max_df,
-            strip_accents="unicode",
-            lowercase=True,
-            stop_words="english",  # Basic English stopwords
-        )
+        if hashing_features:
+            # Stateless tokenisation: no vocabulary pass, only IDF is fitted
+            self.vectorizer = make_pipeline(
+                HashingVectorizer(
+                    n_features=hashing_features,
+                    ngram_range=ngram_range,
+                    strip_accents="unicode",
+                    lowercase=False,  # clean_text already lowercases
+                    stop_words="english",
+                    alternate_sign=False,
+                    norm=None,
+                ),
+                TfidfTransformer(),
+            )
+        else:
+            self.vectorizer = TfidfVectorizer(
+                max_features=max_features,
+                ngram_range=ngram_range,
+                min_df=min_df,
+                max_df=max_df,
+                strip_accents="unicode",
+                lowercase=False,  # clean_text already lowercases
+                stop_words="english",  # Basic English stopwords
+            )
 
         logger.info(
             f"TextFeatureExtractor initialized: max_features={max_features}, "
-            f"ngram_range={ngram_range}"
+            f"ngram_range={ngram_range}, hashing_features={hashing_features}"
         )
 
     def fit(self, df: pd.DataFrame) -> "TextFeatureExtractor":
@@ -102,11 +152,75 @@ class TextFeatureExtractor:
         Returns:
             TF-IDF feature matrix
         """
+        cache_file = None
+        if self.cache_dir is not None:
+            cache_file = self.cache_dir / f"tfidf_{self._fit_cache_key(df)}.joblib"
+            cached = self._load_fit(cache_file)
+            if cached is not None:
+                self.vectorizer, features = cached
+                logger.info(f"Loaded fitted vectorizer and features from cache: {cache_file}")
+                return features
+
         texts = self._combine_texts(df)
         features = self.vectorizer.fit_transform(texts)
         logger.info(f"Fit and transformed {len(texts)} samples to {features.shape[1]} features")
+
+        if cache_file is not None:
+            self._save_fit(cache_file, features)
         return features
 
+    def _fit_cache_key(self, df: pd.DataFrame) -> str:
+        """Digest of the input texts (in order) and of the vectorizer settings."""
+        digest = hashlib.blake2b(digest_size=16)
+        for column in ("designation", "description"):
+            if column in df.columns:
+                hashes = pd.util.hash_pandas_object(df[column].astype(str), index=False)
+                digest.update(hashes.to_numpy().tobytes())
+            digest.update(column.encode())
+        digest.update(
+            repr(
+                (
+                    self.max_features,
+                    self.ngram_range,
+                    self.min_df,
+                    self.max_df,
+                    self.hashing_features,
+                    sklearn.__version__,
+                    FIT_CACHE_VERSION,
+                )
+            ).encode()
+        )
+        return digest.hexdigest()
+
+    def _load_fit(self, cache_file: Path):
+        """Read a cached (vectorizer, features) pair, or None when missing or unreadable."""
+        if not cache_file.exists():
+            return None
+
+        try:
+            return joblib.load(cache_file)
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable vectorizer cache {cache_file}: {e}")
+            return None
+
+    def _save_fit(self, cache_file: Path, features):
+        """Persist the fitted vectorizer and features, pruning old entries."""
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp_file = cache_file.with_suffix(".tmp")
+            joblib.dump((self.vectorizer, features), tmp_file)
+            os.replace(tmp_file, cache_file)
+
+            cached = sorted(
+                self.cache_dir.glob("tfidf_*.joblib"),
+                key=lambda f: f.stat().st_mtime,
+                reverse=True,
+            )
+            for stale in cached[FIT_CACHE_KEEP:]:
+                stale.unlink(missing_ok=True)
+        except Exception as e:
+            logger.warning(f"Failed to cache fitted vectorizer: {e}")
+
     def _combine_texts(self, df: pd.DataFrame) -> list:
         """
         Combine designation and description into single text.
@@ -117,37 +231,29 @@ class TextFeatureExtractor:
         Returns:
             List of combined texts
         """
-        texts = []
-        for _, row in df.iterrows():
-            designation = str(row.get("designation", ""))
-            description = str(row.get("description", ""))
+        cleaned = []
+        for column in ("designation", "description"):
+            if column in df.columns:
+                # str() per value, as before (a missing value becomes "nan")
+                cleaned.append(clean_text_series(df[column].astype(str), n_jobs=-1))
+            else:
+                cleaned.append(pd.Series("", index=df.index, dtype=object))
 
-            # Preprocess each field
-            designation_clean = clean_text(designation)
-            description_clean = clean_text(description)
-
-            # Combine with space
-            combined = f"{designation_clean} {description_clean}"
-            texts.append(combined)
-
-        return texts
+        # Combine with space
+        return cleaned[0].str.cat(cleaned[1], sep=" ").tolist()
 
     def get_feature_names(self) -> list:
         """Get feature names (vocabulary)"""
+        if self.hashing_features:
+            raise ValueError("Feature names are not available with hashing features")
         return self.vectorizer.get_feature_names_out().tolist()
 
     def save_vectorizer(self, path: str):
-        """Save vectorizer to file"""
-        import pickle
-
-        with open(path, "wb") as f:
-            pickle.dump(self.vectorizer, f)
+        """Save vectorizer to file (joblib, compressed)"""
+        joblib.dump(self.vectorizer, path, compress=VECTORIZER_COMPRESS)
         logger.info(f"Saved vectorizer to {path}")
 
     def load_vectorizer(self, path: str):
-        """Load vectorizer from file"""
-        import pickle
-
-        with open(path, "rb") as f:
-            self.vectorizer = pickle.load(f)
+        """Load vectorizer from file (also reads plain pickles)"""
+        self.vectorizer = joblib.load(path)
         logger.info(f"Loaded vectorizer from {path}")
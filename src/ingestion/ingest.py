@@ -1,21 +1,22 @@
 """
 Ingestion module:
     1. Download ZIP from MinIO (landing/incoming/)
-    2. Unzip: extract products.csv + images/
+    2. Stream products.csv + images/ out of the ZIP (no extraction to disk)
     3. Load products.csv → raw_products (PostgreSQL)
     4. Upload images → MinIO (dvc-storage/images/)
-    5. Archive ZIP (incoming/ → archived/)
+    5. Archive ZIPs (incoming/ → archived/, one batched delete)
 """
 
 import logging
 import os
-import shutil
 import zipfile
+from concurrent.futures import ThreadPoolExecutor
 
 import pandas as pd
 import psycopg2
 from airflow.providers.amazon.aws.hooks.s3 import S3Hook
-from psycopg2.extras import execute_values
+
+from src.data.bulk import copy_dataframe
 
 logger = logging.getLogger(__name__)
 
@@ -23,6 +24,9 @@ MINIO_CONN_ID = "minio_s3"
 LANDING_BUCKET = "landing"
 IMAGES_BUCKET = "dvc-storage"
 TMP_DIR = "/tmp/rakuten_ingest"
+IMAGE_UPLOAD_WORKERS = 16
+ARCHIVE_COPY_WORKERS = 8
+IMAGE_EXTENSIONS = frozenset({".jpg", ".jpeg", ".png"})
 
 
 def get_pg_conn():
@@ -58,25 +62,13 @@ def download_zip(key: str) -> str:
     return local_path
 
 
-def unzip_file(zip_path: str) -> str:
-    """Unzip file and return extraction directory."""
-    extract_dir = zip_path.replace(".zip", "")
-    os.makedirs(extract_dir, exist_ok=True)
-
+def load_csv_to_raw(zip_path: str, batch_id: str) -> int:
+    """Load products.csv into raw_products table (read straight from the ZIP)"""
     with zipfile.ZipFile(zip_path, "r") as zf:
-        zf.extractall(extract_dir)
-
-    logger.info(f"Unzipped → {extract_dir}")
-    return extract_dir
-
-
-def load_csv_to_raw(extract_dir: str, batch_id: str) -> int:
-    """Load products.csv into raw_products table"""
-    csv_path = os.path.join(extract_dir, "products.csv")
-    if not os.path.exists(csv_path):
-        raise FileNotFoundError(f"products.csv not found in {extract_dir}")
-
-    df = pd.read_csv(csv_path, sep=";", encoding="utf-8")
+        if "products.csv" not in zf.namelist():
+            raise FileNotFoundError(f"products.csv not found in {zip_path}")
+        with zf.open("products.csv") as f:
+            df = pd.read_csv(f, sep=";", encoding="utf-8")
     logger.info(f"CSV loaded: {len(df)} rows, columns: {list(df.columns)}")
 
     # Add pipeline metadata
@@ -109,14 +101,11 @@ def load_csv_to_raw(extract_dir: str, batch_id: str) -> int:
         "source_file",
     ]
 
-    values = [tuple(row[col] for col in columns) for _, row in df.iterrows()]
+    # Bulk load: let the commit return without waiting for the WAL fsync
+    cursor.execute("SET LOCAL synchronous_commit = OFF")
 
-    insert_query = f"""
-        INSERT INTO raw_products ({", ".join(columns)})
-        VALUES %s
-    """
-
-    execute_values(cursor, insert_query, values, page_size=1000)
+    # One COPY stream instead of multi-row INSERT statements
+    copy_dataframe(cursor, df, "raw_products", columns)
     conn.commit()
     cursor.close()
     conn.close()
@@ -125,53 +114,70 @@ def load_csv_to_raw(extract_dir: str, batch_id: str) -> int:
     return len(df)
 
 
-def upload_images_to_minio(extract_dir: str, batch_id: str) -> int:
-    """Upload extracted images to MinIO dvc-storage/images/."""
-    images_dir = os.path.join(extract_dir, "images")
-    if not os.path.isdir(images_dir):
-        logger.warning(f"No images/ directory in {extract_dir}")
-        return 0
+def upload_images_to_minio(zip_path: str, batch_id: str) -> int:
+    """Upload images/ members of the ZIP to MinIO dvc-storage/images/.
 
-    hook = S3Hook(aws_conn_id=MINIO_CONN_ID)
-    count = 0
-
-    for img_file in os.listdir(images_dir):
-        if not img_file.lower().endswith((".jpg", ".jpeg", ".png")):
-            continue
-        local_path = os.path.join(images_dir, img_file)
-        s3_key = f"images/{img_file}"
-        hook.load_file(
-            filename=local_path,
-            key=s3_key,
-            bucket_name=IMAGES_BUCKET,
-            replace=True,
-        )
-        count += 1
+    Members are streamed from the archive, nothing is extracted to disk.
+    """
+    with zipfile.ZipFile(zip_path, "r") as zf:
+        # The listing comes from the central directory already in memory
+        img_members = [
+            info.filename
+            for info in zf.infolist()
+            if not info.is_dir()
+            and os.path.dirname(info.filename) == "images"
+            and os.path.splitext(info.filename)[1].lower() in IMAGE_EXTENSIONS
+        ]
+        if not img_members:
+            logger.warning(f"No images/ directory in {zip_path}")
+            return 0
+
+        hook = S3Hook(aws_conn_id=MINIO_CONN_ID)
+        # Build the (thread-safe) boto3 client once before fanning out
+        hook.get_conn()
+
+        def upload(name: str):
+            # ZipFile serialises reads of its shared file handle, so members
+            # can be streamed from several threads
+            with zf.open(name) as f:
+                hook.load_file_obj(
+                    file_obj=f,
+                    key=f"images/{os.path.basename(name)}",
+                    bucket_name=IMAGES_BUCKET,
+                    replace=True,
+                )
+
+        # Each upload is one blocking PUT: overlap them
+        with ThreadPoolExecutor(max_workers=IMAGE_UPLOAD_WORKERS) as executor:
+            list(executor.map(upload, img_members))
+    count = len(img_members)
 
     logger.info(f"Uploaded {count} images to s3://{IMAGES_BUCKET}/images/")
     return count
 
 
-def archive_zip(key: str):
-    """Move ZIP from incoming/ to archived/ in MinIO."""
+def archive_zips(keys: list[str]):
+    """Move ZIPs from incoming/ to archived/ in MinIO."""
     hook = S3Hook(aws_conn_id=MINIO_CONN_ID)
-    archived_key = key.replace("incoming/", "archived/")
+    hook.get_conn()
+
+    def copy(key: str):
+        hook.copy_object(
+            source_bucket_name=LANDING_BUCKET,
+            source_bucket_key=key,
+            dest_bucket_name=LANDING_BUCKET,
+            dest_bucket_key=key.replace("incoming/", "archived/"),
+        )
 
-    hook.copy_object(
-        source_bucket_name=LANDING_BUCKET,
-        source_bucket_key=key,
-        dest_bucket_name=LANDING_BUCKET,
-        dest_bucket_key=archived_key,
-    )
-    hook.delete_objects(bucket=LANDING_BUCKET, keys=[key])
-    logger.info(f"Archived {key} → {archived_key}")
+    # Copies in parallel, then a single batched delete
+    with ThreadPoolExecutor(max_workers=ARCHIVE_COPY_WORKERS) as executor:
+        list(executor.map(copy, keys))
+    hook.delete_objects(bucket=LANDING_BUCKET, keys=keys)
+    logger.info(f"Archived {len(keys)} ZIP(s) to landing/archived/")
 
 
 def cleanup_tmp(zip_path: str):
     """Remove temporary files."""
-    extract_dir = zip_path.replace(".zip", "")
-    if os.path.exists(extract_dir):
-        shutil.rmtree(extract_dir)
     if os.path.exists(zip_path):
         os.remove(zip_path)
     logger.info("Temporary files cleaned up")
@@ -189,34 +195,39 @@ def run_ingestion(**context) -> dict:
         return {"batch_id": None, "rows": 0, "images": 0}
 
     results = []
-
-    for key in zip_keys:
-        batch_id = os.path.basename(key).replace(".zip", "")
-        logger.info(f"Processing batch: {batch_id}")
-
-        # Download + Unzip
-        zip_path = download_zip(key)
-        extract_dir = unzip_file(zip_path)
-
-        # Load CSV → raw_products
-        n_rows = load_csv_to_raw(extract_dir, batch_id)
-
-        # Upload images → MinIO
-        n_images = upload_images_to_minio(extract_dir, batch_id)
-
-        # Archive ZIP
-        archive_zip(key)
-
-        # Cleanup
-        cleanup_tmp(zip_path)
-
-        results.append(
-            {
-                "batch_id": batch_id,
-                "rows": n_rows,
-                "images": n_images,
-            }
-        )
+    processed_keys = []
+
+    try:
+        for key in zip_keys:
+            batch_id = os.path.basename(key).replace(".zip", "")
+            logger.info(f"Processing batch: {batch_id}")
+
+            # Download (members are then streamed from the archive)
+            zip_path = download_zip(key)
+
+            # Load CSV → raw_products and upload images → MinIO concurrently:
+            # the first waits on PostgreSQL, the second on MinIO
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                rows_future = executor.submit(load_csv_to_raw, zip_path, batch_id)
+                images_future = executor.submit(upload_images_to_minio, zip_path, batch_id)
+                n_rows = rows_future.result()
+                n_images = images_future.result()
+
+            # Cleanup
+            cleanup_tmp(zip_path)
+
+            processed_keys.append(key)
+            results.append(
+                {
+                    "batch_id": batch_id,
+                    "rows": n_rows,
+                    "images": n_images,
+                }
+            )
+    finally:
+        # Archive every ZIP that made it through, even if a later one failed
+        if processed_keys:
+            archive_zips(processed_keys)
 
     # Push last batch_id to XCom
     last_batch = results[-1]["batch_id"]
@@ -15,9 +15,10 @@ import os
 sys.path.append(str(Path(__file__).parent.parent.parent))
 
 import mlflow
-from mlflow.tracking import MlflowClient
+from mlflow.entities import RunTag
 
 from src.data.dataset_generator import generate_balanced_dataset, save_and_log_dataset
+from src.models.model_registry import get_client
 from src.models.train import train_model
 from src.config import PIPELINE_CONFIG, MLFLOW_CONFIG
 
@@ -45,7 +46,7 @@ class AutoTrainer:
         self.max_iter = max_iter
 
         mlflow.set_tracking_uri(MLFLOW_CONFIG["tracking_uri"])
-        self.client = MlflowClient()
+        self.client = get_client()
 
     def run(self) -> dict:
         """
@@ -81,7 +82,7 @@ class AutoTrainer:
 
         # Step 3: Train model (register but do NOT promote)
         logger.info("Step 3/3: Training model...")
-        run_id = train_model(
+        training = train_model(
             train_df=df_balanced,
             week_number=week_number,
             max_features=self.max_features,
@@ -89,20 +90,25 @@ class AutoTrainer:
             max_iter=self.max_iter,
             auto_register=True,
             auto_promote=False,
+            return_full=True,
         )
 
-        # Retrieve metrics and model version from MLflow
-        run = self.client.get_run(run_id)
-        f1_score = run.data.metrics.get("test_f1_weighted", 0.0)
-        accuracy = run.data.metrics.get("test_accuracy", 0.0)
-
-        versions = self.client.search_model_versions(f"run_id='{run_id}'")
-        model_version = int(versions[0].version) if versions else None
-
-        # Tag the run as auto-trained
-        self.client.set_tag(run_id, "auto_trained", "true")
-        self.client.set_tag(run_id, "pipeline", "weekly_auto_train")
-        self.client.set_tag(run_id, "week_number", str(week_number))
+        # Metrics and model version come back from training, no MLflow lookup
+        run_id = training["run_id"]
+        model_version = training["model_version"]
+        metrics = training["metrics"]
+        f1_score = metrics.get("test_f1_weighted", 0.0)
+        accuracy = metrics.get("test_accuracy", 0.0)
+
+        # Tag the run as auto-trained (one request for all tags)
+        self.client.log_batch(
+            run_id,
+            tags=[
+                RunTag("auto_trained", "true"),
+                RunTag("pipeline", "weekly_auto_train"),
+                RunTag("week_number", str(week_number)),
+            ],
+        )
 
         result = {
             "run_id": run_id,
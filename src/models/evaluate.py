@@ -4,48 +4,60 @@ Model Evaluation
 Calculate classification metrics and generate evaluation reports.
 """
 from sklearn.metrics import (
-    accuracy_score,
     f1_score,
-    precision_score,
-    recall_score,
     classification_report,
     confusion_matrix,
 )
-import matplotlib.pyplot as plt
-import seaborn as sns
+from matplotlib.figure import Figure
 import numpy as np
-import pandas as pd
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Above this many classes the confusion matrix is drawn without cell values
+CONFUSION_ANNOTATE_MAX_CLASSES = 30
 
-def calculate_metrics(y_true, y_pred, average="weighted"):
+
+def evaluate_all(y_true, y_pred):
     """
-    Calculate classification metrics.
+    Calculate scalar metrics, per-class F1 and the confusion matrix together.
+
+    Every score is derived from one confusion matrix over the labels present
+    in y_true or y_pred (the label set sklearn's averaged scorers use), so
+    the label arrays are scanned once.
 
     Args:
         y_true: True labels
         y_pred: Predicted labels
-        average: Averaging strategy for multiclass
 
     Returns:
-        Dictionary of metrics
+        Dictionary with "metrics" (same keys as calculate_metrics),
+        "per_class" (same keys as calculate_per_class_metrics),
+        "confusion_matrix" (counts, rows = true labels) and "labels"
     """
+    labels = np.unique(np.concatenate([y_true, y_pred]))
+    cm = confusion_matrix(y_true, y_pred, labels=labels)
+
+    tp = np.diag(cm).astype(float)
+    pred_count = cm.sum(axis=0)
+    true_count = cm.sum(axis=1)
+
+    # zero_division=0: a class never predicted (or never seen) scores 0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        precision = np.where(pred_count > 0, tp / pred_count, 0.0)
+        recall = np.where(true_count > 0, tp / true_count, 0.0)
+        f1 = np.where(
+            pred_count + true_count > 0, 2 * tp / (pred_count + true_count), 0.0
+        )
+
     metrics = {
-        "accuracy": accuracy_score(y_true, y_pred),
-        "f1_macro": f1_score(y_true, y_pred, average="macro", zero_division=0),
-        "f1_weighted": f1_score(y_true, y_pred, average="weighted", zero_division=0),
-        "precision_macro": precision_score(
-            y_true, y_pred, average="macro", zero_division=0
-        ),
-        "precision_weighted": precision_score(
-            y_true, y_pred, average="weighted", zero_division=0
-        ),
-        "recall_macro": recall_score(y_true, y_pred, average="macro", zero_division=0),
-        "recall_weighted": recall_score(
-            y_true, y_pred, average="weighted", zero_division=0
-        ),
+        "accuracy": float(tp.sum() / cm.sum()),
+        "f1_macro": float(f1.mean()),
+        "f1_weighted": float(np.average(f1, weights=true_count)),
+        "precision_macro": float(precision.mean()),
+        "precision_weighted": float(np.average(precision, weights=true_count)),
+        "recall_macro": float(recall.mean()),
+        "recall_weighted": float(np.average(recall, weights=true_count)),
     }
 
     logger.info(
@@ -53,7 +65,27 @@ def calculate_metrics(y_true, y_pred, average="weighted"):
         f"f1_weighted={metrics['f1_weighted']:.4f}"
     )
 
-    return metrics
+    return {
+        "metrics": metrics,
+        "per_class": {f"class_{cls}_f1": float(score) for cls, score in zip(labels, f1)},
+        "confusion_matrix": cm,
+        "labels": labels,
+    }
+
+
+def calculate_metrics(y_true, y_pred, average="weighted"):
+    """
+    Calculate classification metrics.
+
+    Args:
+        y_true: True labels
+        y_pred: Predicted labels
+        average: Averaging strategy for multiclass
+
+    Returns:
+        Dictionary of metrics
+    """
+    return evaluate_all(y_true, y_pred)["metrics"]
 
 
 def calculate_per_class_metrics(y_true, y_pred, class_names=None):
@@ -102,7 +134,9 @@ def generate_classification_report(y_true, y_pred, class_names=None):
     return report
 
 
-def plot_confusion_matrix(y_true, y_pred, class_names=None, figsize=(12, 10), normalize=True):
+def plot_confusion_matrix(
+    y_true, y_pred, class_names=None, figsize=(12, 10), normalize=True, cm=None
+):
     """
     Plot confusion matrix.
 
@@ -112,41 +146,72 @@ def plot_confusion_matrix(y_true, y_pred, class_names=None, figsize=(12, 10), no
         class_names: Optional class names
         figsize: Figure size
         normalize: Whether to normalize (show percentages)
+        cm: Precomputed confusion matrix over class_names (e.g. from
+            evaluate_all); y_true/y_pred are then not scanned again
 
     Returns:
         Matplotlib figure
     """
-    cm = confusion_matrix(y_true, y_pred, labels=class_names)
+    if cm is None:
+        cm = confusion_matrix(y_true, y_pred, labels=class_names)
 
     if normalize:
         cm = cm.astype("float") / cm.sum(axis=1)[:, np.newaxis]
 
-    fig, ax = plt.subplots(figsize=figsize)
-
-    # Plot heatmap
-    sns.heatmap(
-        cm,
-        annot=True,
-        fmt=".2f" if normalize else "d",
-        cmap="Blues",
-        xticklabels=class_names if class_names is not None else "auto",
-        yticklabels=class_names if class_names is not None else "auto",
-        ax=ax,
-        cbar_kws={"label": "Percentage" if normalize else "Count"},
-    )
+    # Standalone Figure (no pyplot state to clean up after logging)
+    fig = Figure(figsize=figsize, layout="constrained")
+    ax = fig.subplots()
+
+    im = ax.imshow(cm, cmap="Blues", aspect="auto")
+    fig.colorbar(im, ax=ax, label="Percentage" if normalize else "Count")
+
+    if class_names is not None:
+        ax.set_xticks(range(len(class_names)))
+        ax.set_xticklabels(class_names, rotation=90)
+        ax.set_yticks(range(len(class_names)))
+        ax.set_yticklabels(class_names)
+
+    # One Text artist per cell: only annotate while the grid stays readable
+    if cm.shape[0] <= CONFUSION_ANNOTATE_MAX_CLASSES:
+        threshold = np.nanmax(cm) / 2 if cm.size else 0
+        for (i, j), value in np.ndenumerate(cm):
+            if np.isnan(value):
+                continue
+            ax.text(
+                j,
+                i,
+                f"{value:.2f}" if normalize else f"{value:d}",
+                ha="center",
+                va="center",
+                fontsize=7,
+                color="white" if value > threshold else "black",
+            )
 
     ax.set_xlabel("Predicted Label")
     ax.set_ylabel("True Label")
     ax.set_title("Confusion Matrix" + (" (Normalized)" if normalize else ""))
 
-    plt.tight_layout()
-
     logger.info("Confusion matrix plot generated")
 
     return fig
 
 
-def plot_class_distribution(y_true, y_pred, class_names=None, figsize=(14, 6)):
+def _count_labels(labels, class_names) -> np.ndarray:
+    """Occurrences of each class name in labels (labels outside class_names are ignored)."""
+    class_names = np.asarray(class_names)
+    order = np.argsort(class_names, kind="stable")
+    sorted_names = class_names[order]
+
+    positions = np.searchsorted(sorted_names, labels)
+    positions = np.minimum(positions, len(sorted_names) - 1)
+    known = sorted_names[positions] == labels
+
+    counts = np.empty(len(class_names), dtype=np.int64)
+    counts[order] = np.bincount(positions[known], minlength=len(class_names))
+    return counts
+
+
+def plot_class_distribution(y_true, y_pred, class_names=None, figsize=(14, 6), cm=None):
     """
     Plot class distribution comparison (true vs predicted).
 
@@ -155,6 +220,8 @@ def plot_class_distribution(y_true, y_pred, class_names=None, figsize=(14, 6)):
         y_pred: Predicted labels
         class_names: Optional class names
         figsize: Figure size
+        cm: Precomputed confusion matrix over class_names (e.g. from
+            evaluate_all); counts are then its row and column sums
 
     Returns:
         Matplotlib figure
@@ -163,13 +230,19 @@ def plot_class_distribution(y_true, y_pred, class_names=None, figsize=(14, 6)):
         class_names = np.unique(np.concatenate([y_true, y_pred]))
 
     # Count occurrences
-    true_counts = pd.Series(y_true).value_counts().reindex(class_names, fill_value=0)
-    pred_counts = pd.Series(y_pred).value_counts().reindex(class_names, fill_value=0)
+    if cm is not None:
+        true_counts = cm.sum(axis=1)
+        pred_counts = cm.sum(axis=0)
+    else:
+        true_counts = _count_labels(y_true, class_names)
+        pred_counts = _count_labels(y_pred, class_names)
 
-    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=figsize)
+    # Standalone Figure, like plot_confusion_matrix
+    fig = Figure(figsize=figsize, layout="tight")
+    ax1, ax2 = fig.subplots(1, 2)
 
     # True distribution
-    ax1.bar(range(len(class_names)), true_counts.values)
+    ax1.bar(range(len(class_names)), true_counts)
     ax1.set_xlabel("Class")
     ax1.set_ylabel("Count")
     ax1.set_title("True Class Distribution")
@@ -177,15 +250,13 @@ def plot_class_distribution(y_true, y_pred, class_names=None, figsize=(14, 6)):
     ax1.set_xticklabels(class_names, rotation=45, ha="right")
 
     # Predicted distribution
-    ax2.bar(range(len(class_names)), pred_counts.values, color="orange")
+    ax2.bar(range(len(class_names)), pred_counts, color="orange")
     ax2.set_xlabel("Class")
     ax2.set_ylabel("Count")
     ax2.set_title("Predicted Class Distribution")
     ax2.set_xticks(range(len(class_names)))
     ax2.set_xticklabels(class_names, rotation=45, ha="right")
 
-    plt.tight_layout()
-
     logger.info("Class distribution plot generated")
 
     return fig
@@ -6,15 +6,70 @@ Functions for registering, promoting, and managing models in MLflow Model Regist
 import mlflow
 from mlflow.tracking import MlflowClient
 import logging
+from functools import lru_cache
 from typing import Optional
 
 logger = logging.getLogger(__name__)
 
+# Model version tag carrying the weighted test F1 used for promotion
+F1_TAG = "test_f1_weighted"
+
+
+@lru_cache(maxsize=4)
+def _client_for(tracking_uri: str) -> MlflowClient:
+    return MlflowClient(tracking_uri=tracking_uri)
+
+
+def get_client() -> MlflowClient:
+    """
+    Get an MlflowClient for the current tracking URI, reused within the process.
+
+    Returns:
+        Cached MlflowClient (one per tracking URI)
+    """
+    return _client_for(mlflow.get_tracking_uri())
+
+
+@lru_cache(maxsize=64)
+def _get_run_for(tracking_uri: str, run_id: str):
+    return _client_for(tracking_uri).get_run(run_id)
+
+
+def get_run(run_id: str):
+    """
+    Fetch an MLflow run, memoized per process.
+
+    Only use this for finished runs (e.g. the run behind a registered model
+    version): later metric or tag updates are not seen.
+
+    Args:
+        run_id: MLflow run ID
+
+    Returns:
+        mlflow.entities.Run
+    """
+    return _get_run_for(mlflow.get_tracking_uri(), run_id)
+
+
+def _version_f1(model_version) -> float:
+    """
+    Weighted test F1 of a registered model version.
+
+    Read from the version's own tag (set at registration) so the caller's
+    registry search already carries it; versions registered without the tag
+    fall back to their run's metrics.
+    """
+    f1 = model_version.tags.get(F1_TAG)
+    if f1 is not None:
+        return float(f1)
+    return get_run(model_version.run_id).data.metrics.get(F1_TAG, 0.0)
+
 
 def register_model(
     run_id: str,
     model_name: str = "rakuten_classifier",
     artifact_path: str = "model",
+    tags: Optional[dict] = None,
 ) -> int:
     """
     Register model from run to MLflow Model Registry.
@@ -23,6 +78,7 @@ def register_model(
         run_id: MLflow run ID
         model_name: Name for registered model
         artifact_path: Path to model artifact within run
+        tags: Model version tags, sent with the registration request
 
     Returns:
         Model version number
@@ -32,7 +88,7 @@ def register_model(
 
         logger.info(f"Registering model: {model_uri} as {model_name}")
 
-        model_version = mlflow.register_model(model_uri, model_name)
+        model_version = mlflow.register_model(model_uri, model_name, tags=tags)
 
         logger.info(
             f"Model registered successfully: {model_name} version {model_version.version}"
@@ -61,7 +117,7 @@ def promote_model(
         archive_existing: Whether to archive existing models in the target stage
     """
     try:
-        client = MlflowClient()
+        client = get_client()
 
         logger.info(
             f"Promoting model {model_name} version {version} to {stage} "
@@ -82,6 +138,31 @@ def promote_model(
         raise
 
 
+def get_production_model_info(model_name: str = "rakuten_classifier") -> Optional[dict]:
+    """
+    Get the current Production version of a registered model.
+
+    Args:
+        model_name: Name of registered model
+
+    Returns:
+        dict with version, run_id and f1, or None if no Production model exists
+    """
+    client = get_client()
+
+    production_versions = client.get_latest_versions(model_name, stages=["Production"])
+    if not production_versions:
+        return None
+
+    current_prod = production_versions[0]
+
+    return {
+        "version": int(current_prod.version),
+        "run_id": current_prod.run_id,
+        "f1": _version_f1(current_prod),
+    }
+
+
 def auto_promote_if_better(
     model_name: str,
     new_version: int,
@@ -92,7 +173,9 @@ def auto_promote_if_better(
     Automatically promote new model to Production if it's better than the current one.
     
     Logic:
-    1. If no Production model exists and new model meets threshold → Promote to Production
+    1. If no Production model exists:
+       - If new model meets threshold → Promote to Production
+       - Otherwise → Leave it unstaged (no registry call)
     2. If Production model exists:
        - If new model is better → Promote to Production (archives old)
        - If new model is worse → Archive new model
@@ -104,10 +187,11 @@ def auto_promote_if_better(
         min_f1_threshold: Minimum F1 score to be considered for Production
         
     Returns:
-        dict with promotion decision and details
+        dict with promotion decision and details; "decision" is "promoted",
+        "archived" or "not_promoted" (left unstaged) and matches the registry
     """
     try:
-        client = MlflowClient()
+        client = get_client()
         
         # Get current Production model if it exists
         production_versions = client.get_latest_versions(model_name, stages=["Production"])
@@ -122,6 +206,7 @@ def auto_promote_if_better(
                 promote_model(model_name, new_version, stage="Production", archive_existing=False)
                 return {
                     "promoted": True,
+                    "decision": "promoted",
                     "reason": "First production model (meets threshold)",
                     "new_version": new_version,
                     "new_f1": new_f1_score,
@@ -129,13 +214,17 @@ def auto_promote_if_better(
                     "previous_f1": None,
                 }
             else:
+                # Left in stage "None" (its state since registration) rather
+                # than archived: saves a registry call, and keeps a model that
+                # never qualified out of the Archived pool rollback picks from
                 logger.warning(
                     f"No Production model exists and new model F1={new_f1_score:.4f} "
-                    f"below threshold ({min_f1_threshold}). Archiving."
+                    f"below threshold ({min_f1_threshold}). Not promoting."
                 )
-                promote_model(model_name, new_version, stage="Archived", archive_existing=False)
                 return {
                     "promoted": False,
+                    "decision": "not_promoted",
+                    "stage": None,
                     "reason": f"Below minimum threshold ({min_f1_threshold})",
                     "new_version": new_version,
                     "new_f1": new_f1_score,
@@ -147,9 +236,8 @@ def auto_promote_if_better(
         current_prod = production_versions[0]
         current_version = int(current_prod.version)
         
-        # Get F1 score from current production model's run
-        current_run = client.get_run(current_prod.run_id)
-        current_f1 = current_run.data.metrics.get("test_f1_weighted", 0.0)
+        # F1 score of the current production model
+        current_f1 = _version_f1(current_prod)
         
         logger.info(f"Current Production: version {current_version}, F1={current_f1:.4f}")
         logger.info(f"New model: version {new_version}, F1={new_f1_score:.4f}")
@@ -164,6 +252,7 @@ def auto_promote_if_better(
             promote_model(model_name, new_version, stage="Production", archive_existing=True)
             return {
                 "promoted": True,
+                "decision": "promoted",
                 "reason": f"Better performance (+{improvement:.2f}%)",
                 "new_version": new_version,
                 "new_f1": new_f1_score,
@@ -181,6 +270,7 @@ def auto_promote_if_better(
             promote_model(model_name, new_version, stage="Archived", archive_existing=False)
             return {
                 "promoted": False,
+                "decision": "archived",
                 "reason": f"Worse than current production (-{degradation:.2f}%)",
                 "new_version": new_version,
                 "new_f1": new_f1_score,
@@ -206,7 +296,7 @@ def get_latest_model_version(model_name: str, stage: Optional[str] = None) -> Op
         Dictionary with version info or None if not found
     """
     try:
-        client = MlflowClient()
+        client = get_client()
 
         if stage:
             versions = client.get_latest_versions(model_name, stages=[stage])
@@ -254,7 +344,7 @@ def list_model_versions(model_name: str, stage: Optional[str] = None) -> list:
         List of version info dictionaries
     """
     try:
-        client = MlflowClient()
+        client = get_client()
 
         if stage:
             versions = client.get_latest_versions(model_name, stages=[stage])
@@ -290,7 +380,7 @@ def delete_model_version(model_name: str, version: int):
         version: Model version number to delete
     """
     try:
-        client = MlflowClient()
+        client = get_client()
 
         logger.info(f"Deleting model {model_name} version {version}")
 
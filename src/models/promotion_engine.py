@@ -12,9 +12,9 @@ from datetime import datetime
 from pathlib import Path
 
 import mlflow
-from mlflow.tracking import MlflowClient
+from mlflow.entities import RunTag
 
-from src.models.model_registry import auto_promote_if_better
+from src.models.model_registry import auto_promote_if_better, get_client
 from src.config import MLFLOW_CONFIG
 
 logger = logging.getLogger(__name__)
@@ -45,7 +45,7 @@ class PromotionEngine:
         )
 
         mlflow.set_tracking_uri(MLFLOW_CONFIG["tracking_uri"])
-        self.client = MlflowClient()
+        self.client = get_client()
 
         self.decision_log_path = Path(
             os.getenv("PROMOTION_LOG_PATH", "./logs/promotion_decisions.jsonl")
@@ -67,7 +67,7 @@ class PromotionEngine:
             run_id: MLflow run ID (for tagging the decision)
 
         Returns:
-            dict: Promotion decision with keys: promoted, reason, new_version, new_f1, ...
+            dict: Promotion decision with keys: promoted, decision, reason, new_version, new_f1, ...
         """
         logger.info("=" * 80)
         logger.info("PROMOTION ENGINE: Evaluating model for production")
@@ -80,6 +80,7 @@ class PromotionEngine:
         if not self.enabled:
             result = {
                 "promoted": False,
+                "decision": "not_promoted",
                 "reason": "Auto-promotion is disabled",
                 "new_version": model_version,
                 "new_f1": f1_score,
@@ -92,6 +93,7 @@ class PromotionEngine:
         if model_version is None:
             result = {
                 "promoted": False,
+                "decision": "not_promoted",
                 "reason": "No model version provided",
                 "new_f1": f1_score,
                 "timestamp": datetime.now().isoformat(),
@@ -113,9 +115,13 @@ class PromotionEngine:
 
         # Tag the MLflow run with the promotion decision
         if run_id:
-            decision_tag = "promoted" if result["promoted"] else "archived"
-            self.client.set_tag(run_id, "promotion_decision", decision_tag)
-            self.client.set_tag(run_id, "promotion_reason", result.get("reason", ""))
+            self.client.log_batch(
+                run_id,
+                tags=[
+                    RunTag("promotion_decision", result["decision"]),
+                    RunTag("promotion_reason", str(result.get("reason", ""))),
+                ],
+            )
 
         self._log_decision(result)
 
@@ -123,7 +129,7 @@ class PromotionEngine:
             logger.info(f"Model v{model_version} PROMOTED to Production!")
         else:
             logger.info(
-                f"Model v{model_version} ARCHIVED: {result.get('reason')}"
+                f"Model v{model_version} {result['decision'].upper()}: {result.get('reason')}"
             )
 
         return result
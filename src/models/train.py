@@ -15,19 +15,26 @@ import mlflow
 import mlflow.sklearn
 import pandas as pd
 import numpy as np
-from sklearn.linear_model import LogisticRegression
+import pyarrow.parquet as pq
+from sklearn.linear_model import LogisticRegression, SGDClassifier
 from sklearn.pipeline import Pipeline
 from sklearn.model_selection import train_test_split
 import pickle
 
+from src.config import DATASET_CACHE_PATH
 from src.features.text_features import TextFeatureExtractor
 from src.models.evaluate import (
     calculate_metrics,
-    calculate_per_class_metrics,
+    evaluate_all,
     plot_confusion_matrix,
     plot_class_distribution,
 )
-from src.models.model_registry import register_model, promote_model, auto_promote_if_better
+from src.models.model_registry import (
+    F1_TAG,
+    auto_promote_if_better,
+    promote_model,
+    register_model,
+)
 
 # Configure logging
 logging.basicConfig(
@@ -35,6 +42,12 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# classifier option -> model_type param/tag
+MODEL_TYPES = {
+    "logreg": "tfidf_logreg",
+    "sgd": "tfidf_sgd",
+}
+
 
 def _resolve_git_sha() -> str:
     """Resolve git commit SHA from env var, .git/HEAD file, or subprocess."""
@@ -66,6 +79,16 @@ def _resolve_git_sha() -> str:
     return "unknown"
 
 
+def _read_parquet_mmap(path: str) -> pd.DataFrame:
+    """Read a downloaded Parquet artifact through a memory map.
+
+    Arrow buffers are released column by column while converting
+    (self_destruct), so the frame is not held twice in memory.
+    """
+    table = pq.read_table(path, memory_map=True)
+    return table.to_pandas(self_destruct=True)
+
+
 def load_dataset_from_mlflow(dataset_run_id: str) -> tuple:
     """
     Load dataset from MLflow artifacts.
@@ -83,14 +106,14 @@ def load_dataset_from_mlflow(dataset_run_id: str) -> tuple:
         train_path = mlflow.artifacts.download_artifacts(
             artifact_uri=f"runs:/{dataset_run_id}/train_dataset.parquet"
         )
-        train_df = pd.read_parquet(train_path)
+        train_df = _read_parquet_mmap(train_path)
 
         # Try to download test dataset (may not exist in dataset run)
         try:
             test_path = mlflow.artifacts.download_artifacts(
                 artifact_uri=f"runs:/{dataset_run_id}/test_dataset.parquet"
             )
-            test_df = pd.read_parquet(test_path)
+            test_df = _read_parquet_mmap(test_path)
         except:
             logger.warning("Test dataset not found in MLflow, will use split")
             test_df = None
@@ -117,6 +140,10 @@ def train_model(
     max_iter: int = 1000,
     auto_register: bool = True,
     auto_promote: bool = False,
+    hashing_features: int = None,
+    classifier: str = "logreg",
+    return_full: bool = False,
+    cache_features: bool = False,
 ):
     """
     Train TF-IDF + LogisticRegression classifier.
@@ -132,10 +159,24 @@ def train_model(
         max_iter: Max iterations for LogisticRegression
         auto_register: Whether to register model in registry
         auto_promote: Whether to auto-promote to Production
+        hashing_features: Use HashingVectorizer + TfidfTransformer with this
+            many features instead of a fitted TF-IDF vocabulary
+        classifier: "logreg" (LogisticRegression, lbfgs) or "sgd"
+            (SGDClassifier with log loss, same regularization strength,
+            one-vs-rest fitted in parallel; faster on large datasets)
+        return_full: Return a summary dict instead of the run ID
+        cache_features: Reuse/persist the fitted vectorizer and training
+            features under DATASET_CACHE_PATH/tfidf (only pays off when the
+            same training data is fitted again, e.g. hyperparameter sweeps)
 
     Returns:
-        str: MLflow run ID of the trained model
+        str: MLflow run ID of the trained model, or with return_full a dict
+            with run_id, model_version (None if not registered) and metrics
+            (the logged train_*/test_* values)
     """
+    if classifier not in MODEL_TYPES:
+        raise ValueError(f"Unknown classifier: {classifier} (expected one of {list(MODEL_TYPES)})")
+
     logger.info("=" * 80)
     logger.info("🚀 Starting Model Training")
     logger.info("=" * 80)
@@ -178,7 +219,7 @@ def train_model(
             "ngram_range_max": ngram_range[1],
             "C": C,
             "max_iter": max_iter,
-            "model_type": "tfidf_logreg",
+            "model_type": MODEL_TYPES[classifier],
             "n_train_samples": len(X_train),
             "n_test_samples": len(X_test),
             "n_classes": len(np.unique(y_train)),
@@ -188,6 +229,8 @@ def train_model(
             params["dataset_run_id"] = dataset_run_id
         if week_number:
             params["week_number"] = week_number
+        if hashing_features:
+            params["hashing_features"] = hashing_features
 
         mlflow.log_params(params)
 
@@ -198,6 +241,8 @@ def train_model(
             ngram_range=ngram_range,
             min_df=2,
             max_df=0.95,
+            hashing_features=hashing_features,
+            cache_dir=DATASET_CACHE_PATH / "tfidf" if cache_features else None,
         )
 
         X_train_features = feature_extractor.fit_transform(X_train)
@@ -208,17 +253,28 @@ def train_model(
         )
 
         # Train model
-        logger.info("Training LogisticRegression...")
-        model = LogisticRegression(
-            C=C,
-            max_iter=max_iter,
-            multi_class="multinomial",
-            solver="lbfgs",
-            class_weight="balanced",
-            random_state=42,
-            n_jobs=-1,
-            verbose=0,
-        )
+        if classifier == "sgd":
+            logger.info("Training SGDClassifier...")
+            model = SGDClassifier(
+                loss="log_loss",  # keeps predict_proba for the API
+                alpha=1.0 / (C * X_train_features.shape[0]),
+                max_iter=max_iter,
+                class_weight="balanced",
+                random_state=42,
+                n_jobs=-1,
+            )
+        else:
+            logger.info("Training LogisticRegression...")
+            model = LogisticRegression(
+                C=C,
+                max_iter=max_iter,
+                multi_class="multinomial",
+                solver="lbfgs",
+                class_weight="balanced",
+                random_state=42,
+                n_jobs=-1,
+                verbose=0,
+            )
 
         model.fit(X_train_features, y_train)
         logger.info("Model training complete")
@@ -230,7 +286,10 @@ def train_model(
 
         # Calculate metrics
         train_metrics = calculate_metrics(y_train, y_pred_train)
-        test_metrics = calculate_metrics(y_test, y_pred_test)
+        # Test metrics, per-class F1 and the plotted confusion matrix all come
+        # from one confusion matrix
+        test_eval = evaluate_all(y_test, y_pred_test)
+        test_metrics = test_eval["metrics"]
 
         # Log metrics
         mlflow.log_metrics({f"train_{k}": v for k, v in train_metrics.items()})
@@ -242,7 +301,7 @@ def train_model(
         logger.info(f"Test F1 (weighted): {test_metrics['f1_weighted']:.4f}")
 
         # Per-class metrics (log only top classes to avoid too many metrics)
-        test_per_class = calculate_per_class_metrics(y_test, y_pred_test)
+        test_per_class = test_eval["per_class"]
         # Log only top 10 classes by support
         top_classes = pd.Series(y_test).value_counts().head(10).index
         for cls in top_classes:
@@ -253,13 +312,22 @@ def train_model(
         # Create and log confusion matrix
         logger.info("Generating confusion matrix...")
         fig_cm = plot_confusion_matrix(
-            y_test, y_pred_test, class_names=model.classes_, normalize=True
+            y_test,
+            y_pred_test,
+            class_names=test_eval["labels"],
+            normalize=True,
+            cm=test_eval["confusion_matrix"],
         )
         mlflow.log_figure(fig_cm, "confusion_matrix.png")
 
         # Create and log class distribution
         logger.info("Generating class distribution plots...")
-        fig_dist = plot_class_distribution(y_test, y_pred_test, class_names=model.classes_)
+        fig_dist = plot_class_distribution(
+            y_test,
+            y_pred_test,
+            class_names=test_eval["labels"],
+            cm=test_eval["confusion_matrix"],
+        )
         mlflow.log_figure(fig_dist, "class_distribution.png")
 
         # Create sklearn Pipeline
@@ -298,7 +366,7 @@ def train_model(
 
         # Add tags
         tags = {
-            "model_type": "tfidf_logreg",
+            "model_type": MODEL_TYPES[classifier],
             "git_commit_sha": _resolve_git_sha(),
         }
         if dataset_run_id:
@@ -315,10 +383,15 @@ def train_model(
         logger.info("=" * 80)
 
         # Register model if requested
+        version = None
         if auto_register:
             logger.info("Registering model to Model Registry...")
             try:
-                version = register_model(run_id, model_name="rakuten_classifier")
+                version = register_model(
+                    run_id,
+                    model_name="rakuten_classifier",
+                    tags={F1_TAG: str(test_metrics["f1_weighted"])},
+                )
                 logger.info(f"Model registered: version {version}")
 
                 # Auto-promote based on performance comparison
@@ -336,12 +409,21 @@ def train_model(
                         logger.info(f"✅ Model promoted to Production!")
                         logger.info(f"   Reason: {promotion_result['reason']}")
                     else:
-                        logger.info(f"📦 Model archived")
+                        logger.info(f"📦 Model {promotion_result['decision'].replace('_', ' ')}")
                         logger.info(f"   Reason: {promotion_result['reason']}")
                         
             except Exception as e:
                 logger.error(f"Failed to register/promote model: {e}")
 
+        if return_full:
+            return {
+                "run_id": run_id,
+                "model_version": version,
+                "metrics": {
+                    **{f"train_{k}": v for k, v in train_metrics.items()},
+                    **{f"test_{k}": v for k, v in test_metrics.items()},
+                },
+            }
         return run_id
 
 
@@ -366,6 +448,23 @@ if __name__ == "__main__":
     parser.add_argument(
         "--auto-promote", action="store_true", help="Auto-promote to Production"
     )
+    parser.add_argument(
+        "--hashing-features",
+        type=int,
+        default=None,
+        help="Hash tokens into N features instead of fitting a vocabulary (e.g. 262144)",
+    )
+    parser.add_argument(
+        "--classifier",
+        choices=list(MODEL_TYPES),
+        default="logreg",
+        help="LogisticRegression (logreg) or SGDClassifier (sgd, faster on large datasets)",
+    )
+    parser.add_argument(
+        "--cache-features",
+        action="store_true",
+        help="Cache the fitted TF-IDF vectorizer and features for re-runs on the same data",
+    )
 
     args = parser.parse_args()
 
@@ -378,6 +477,9 @@ if __name__ == "__main__":
             max_iter=args.max_iter,
             auto_register=args.auto_register,
             auto_promote=args.auto_promote,
+            hashing_features=args.hashing_features,
+            classifier=args.classifier,
+            cache_features=args.cache_features,
         )
         logger.info(f"Training completed successfully: {run_id}")
     except Exception as e:
@@ -19,21 +19,34 @@ from typing import Dict, Optional
 
 import pandas as pd
 import numpy as np
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.dataset as ds
 import psycopg2
 from psycopg2.extras import Json
 
 sys.path.append(str(Path(__file__).parent.parent.parent))
 
+from src.config import INFERENCE_LOG_PATH
 from src.monitoring.statistical_tests import compute_drift_scores
 from src.monitoring import thresholds
 
 logger = logging.getLogger(__name__)
 
-# Inference log path (inside API container it's /app/data/monitoring/,
-# from host or Airflow it's ./data/monitoring/)
-DEFAULT_INFERENCE_LOG = os.getenv(
-    "INFERENCE_LOG_PATH", "./data/monitoring/inference_log.csv"
-)
+# Hour-partitioned Parquet copy written by the API's InferenceLogger
+DEFAULT_INFERENCE_LOG_DATASET = os.getenv("INFERENCE_LOG_DATASET_PATH")
+
+# Only the columns used by the statistical tests are read; the free-text
+# designation/description columns dominate the file size and are skipped.
+DRIFT_LOG_COLUMNS = ("timestamp", "predicted_class", "confidence", "text_length")
+DRIFT_LOG_DTYPES = {"confidence": "float32"}
+DRIFT_LOG_ARROW_TYPES = {
+    "timestamp": pa.timestamp("us"),
+    "predicted_class": pa.int64(),
+    "confidence": pa.float32(),
+    "text_length": pa.int64(),
+}
+LOG_READ_CHUNKSIZE = int(os.getenv("DRIFT_CHUNKSIZE", "200000"))
 
 
 class DriftMonitor:
@@ -50,8 +63,18 @@ class DriftMonitor:
         postgres_config: dict = None,
         reference_window_days: int = 30,
         current_window_days: int = 7,
+        inference_log_dataset_path: str = None,
+        chunksize: int = None,
     ):
-        self.inference_log_path = inference_log_path or DEFAULT_INFERENCE_LOG
+        self.inference_log_path = inference_log_path or str(INFERENCE_LOG_PATH)
+        self.chunksize = chunksize or LOG_READ_CHUNKSIZE
+        if inference_log_dataset_path is None:
+            inference_log_dataset_path = (
+                DEFAULT_INFERENCE_LOG_DATASET
+                if inference_log_path is None and DEFAULT_INFERENCE_LOG_DATASET
+                else Path(self.inference_log_path).with_suffix("")
+            )
+        self.inference_log_dataset_path = Path(inference_log_dataset_path)
         self.reference_window_days = reference_window_days
         self.current_window_days = current_window_days
 
@@ -69,21 +92,176 @@ class DriftMonitor:
     # -----------------------------------------------------------------
     # Data loading
     # -----------------------------------------------------------------
+    def _has_inference_dataset(self) -> bool:
+        """Whether the API has written a Parquet inference log."""
+        return any(self.inference_log_dataset_path.glob("date=*/hour=*/*.parquet"))
+
+    def _window_start(self) -> datetime:
+        """Oldest timestamp any drift window can include."""
+        return datetime.utcnow() - timedelta(days=self.reference_window_days)
+
+    def _inference_dataset_filter(self):
+        """Arrow filter keeping rows inside the reference window."""
+        return ds.field("timestamp") >= self._window_start()
+
+    def _inference_dataset(self) -> Optional[ds.Dataset]:
+        """
+        Parquet log restricted to the date partitions of the drift windows.
+
+        Only the ~reference_window_days+1 date=YYYY-MM-DD directories are
+        listed, so the number of files touched stays constant however much
+        history the log holds. Returns None when no partition is in range.
+        """
+        base = self.inference_log_dataset_path
+        # One day of slack each side; the timestamp filter trims the edges
+        first_day = self._window_start().date() - timedelta(days=1)
+        last_day = datetime.utcnow().date() + timedelta(days=1)
+        days = pd.date_range(first_day, last_day, freq="D")
+
+        files = [
+            str(f)
+            for day in days
+            for f in sorted((base / f"date={day:%Y-%m-%d}").glob("hour=*/*.parquet"))
+        ]
+        if not files:
+            return None
+
+        return ds.dataset(
+            files,
+            format="parquet",
+            partitioning="hive",
+            partition_base_dir=str(base),
+        )
+
+    def count_samples(self) -> Optional[int]:
+        """
+        Cheaply count the samples a drift analysis would load.
+
+        Only available for the Parquet log, where Arrow answers from file
+        metadata and row-group statistics without decoding the rows.
+
+        Returns:
+            Sample count, or None when it cannot be known without a full read
+        """
+        if not self._has_inference_dataset():
+            return None
+
+        try:
+            dataset = self._inference_dataset()
+            if dataset is None:
+                return 0
+            return dataset.count_rows(filter=self._inference_dataset_filter())
+        except Exception as e:
+            logger.warning(f"Failed to count inference log rows: {e}")
+            return None
+
     def _load_inference_log(self) -> Optional[pd.DataFrame]:
-        """Load inference log CSV into a DataFrame."""
+        """
+        Load the inference log into a DataFrame.
+
+        The Parquet dataset is preferred when the API has written one; the
+        CSV log is the fallback.
+        """
+        if self._has_inference_dataset():
+            return self._load_inference_dataset()
+        return self._load_inference_csv()
+
+    def _load_inference_dataset(self) -> Optional[pd.DataFrame]:
+        """
+        Load the Parquet inference log into a DataFrame.
+
+        Only date partitions inside the windows are opened, only
+        DRIFT_LOG_COLUMNS are decoded, and rows older than the reference
+        window are filtered inside Arrow (row groups whose timestamp
+        statistics fall outside the window are skipped).
+        """
+        path = self.inference_log_dataset_path
+        try:
+            dataset = self._inference_dataset()
+            if dataset is None:
+                logger.warning("No inference log partitions inside the drift windows")
+                return None
+
+            table = dataset.to_table(
+                columns=list(DRIFT_LOG_COLUMNS),
+                filter=self._inference_dataset_filter(),
+            )
+            df = table.to_pandas(self_destruct=True)
+            if len(df) == 0:
+                logger.warning("Inference log is empty")
+                return None
+
+            return df
+        except Exception as e:
+            logger.error(f"Failed to read inference log dataset {path}: {e}")
+            return None
+
+    def _load_inference_csv(self) -> Optional[pd.DataFrame]:
+        """
+        Load inference log CSV into a DataFrame.
+
+        The Arrow CSV reader parses blocks of the file on all cores and only
+        materialises DRIFT_LOG_COLUMNS, with types fixed up front instead of
+        inferred. Logs holding values Arrow cannot convert (e.g. a corrupt
+        timestamp) fall back to the pandas reader, which drops those rows.
+        """
         path = Path(self.inference_log_path)
         if not path.exists():
             logger.warning(f"Inference log not found: {path}")
             return None
 
         try:
-            df = pd.read_csv(path)
+            table = pacsv.read_csv(
+                path,
+                read_options=pacsv.ReadOptions(block_size=1 << 22, use_threads=True),
+                # Free-text columns may hold quoted newlines
+                parse_options=pacsv.ParseOptions(newlines_in_values=True),
+                convert_options=pacsv.ConvertOptions(
+                    include_columns=list(DRIFT_LOG_COLUMNS),
+                    include_missing_columns=True,
+                    column_types=DRIFT_LOG_ARROW_TYPES,
+                ),
+            )
+            df = table.to_pandas(self_destruct=True, split_blocks=True)
+            df = df.dropna(subset=["timestamp"])
+            if len(df) == 0:
+                logger.warning("Inference log is empty")
+                return None
+
+            return df
+        except pa.ArrowInvalid as e:
+            logger.warning(f"Arrow could not parse {path} ({e}), using pandas")
+            return self._load_inference_csv_pandas(path)
+        except Exception as e:
+            logger.error(f"Failed to read inference log: {e}")
+            return None
+
+    def _load_inference_csv_pandas(self, path: Path) -> Optional[pd.DataFrame]:
+        """
+        Tolerant CSV fallback.
+
+        The file is streamed in chunks of `chunksize` rows restricted to
+        DRIFT_LOG_COLUMNS, and rows with an unparseable timestamp are dropped
+        chunk by chunk, so peak memory stays close to the size of the final
+        frame.
+        """
+        try:
+            chunks = []
+            reader = pd.read_csv(
+                path,
+                usecols=lambda col: col in DRIFT_LOG_COLUMNS,
+                dtype=DRIFT_LOG_DTYPES,
+                chunksize=self.chunksize,
+            )
+            for chunk in reader:
+                chunk["timestamp"] = pd.to_datetime(chunk["timestamp"], errors="coerce")
+                chunks.append(chunk.dropna(subset=["timestamp"]))
+
+            df = pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame()
             if len(df) == 0:
                 logger.warning("Inference log is empty")
                 return None
 
-            df["timestamp"] = pd.to_datetime(df["timestamp"], errors="coerce")
-            df = df.dropna(subset=["timestamp"])
             return df
         except Exception as e:
             logger.error(f"Failed to read inference log: {e}")
@@ -113,10 +291,11 @@ class DriftMonitor:
         current_start = now - timedelta(days=self.current_window_days)
         reference_start = now - timedelta(days=self.reference_window_days)
 
+        # Boolean indexing already returns new frames; no extra .copy() needed
         reference_df = df[
             (df["timestamp"] >= reference_start) & (df["timestamp"] < current_start)
-        ].copy()
-        current_df = df[df["timestamp"] >= current_start].copy()
+        ]
+        current_df = df[df["timestamp"] >= current_start]
 
         # -- Fallback: random split for cold-start scenarios --
         # A chronological split would create artificial drift when older
@@ -132,8 +311,8 @@ class DriftMonitor:
             )
             df_shuffled = df.sample(frac=1, random_state=42).reset_index(drop=True)
             split_idx = int(len(df_shuffled) * 0.6)
-            reference_df = df_shuffled.iloc[:split_idx].copy()
-            current_df = df_shuffled.iloc[split_idx:].copy()
+            reference_df = df_shuffled.iloc[:split_idx]
+            current_df = df_shuffled.iloc[split_idx:]
 
         logger.info(
             f"Windows: reference={len(reference_df)} samples "
@@ -164,6 +343,17 @@ class DriftMonitor:
         logger.info("DRIFT MONITOR: Starting drift analysis")
         logger.info("=" * 80)
 
+        # Skip the full read when metadata already shows too few samples
+        sample_count = self.count_samples()
+        if sample_count is not None and sample_count < thresholds.MIN_SAMPLES_FOR_DRIFT:
+            report = self._build_report(
+                status="insufficient_data",
+                message=f"Only {sample_count} samples, need {thresholds.MIN_SAMPLES_FOR_DRIFT}",
+                total_samples=sample_count,
+            )
+            self._save_report_to_db(report)
+            return report
+
         # Load data
         df = self._load_inference_log()
         if df is None:
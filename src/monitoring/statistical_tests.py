@@ -18,6 +18,126 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# Continuous columns compared with PSI / KS / JSD
+CONTINUOUS_COLUMNS = ("text_length", "confidence")
+
+
+def _breakpoints(ref_sorted: np.ndarray, current: np.ndarray, bins: int) -> np.ndarray:
+    """Equal-width bin edges spanning both samples (reference pre-sorted)."""
+    return np.linspace(
+        min(ref_sorted[0], np.min(current)),
+        max(ref_sorted[-1], np.max(current)),
+        bins + 1,
+    )
+
+
+def _sorted_histogram(sorted_values: np.ndarray, edges: np.ndarray) -> np.ndarray:
+    """
+    Histogram of already-sorted values in O(bins log n).
+
+    Same counts as ``np.histogram(values, bins=edges)``: bins are half-open
+    except the last one, which includes its right edge.
+    """
+    cumulative = np.concatenate(
+        (
+            sorted_values.searchsorted(edges[:-1], "left"),
+            sorted_values.searchsorted(edges[-1:], "right"),
+        )
+    )
+    return np.diff(cumulative)
+
+
+def summarize_reference(reference_df: pd.DataFrame) -> Dict:
+    """
+    Precompute the reference-window state shared by the drift tests.
+
+    Continuous columns are kept sorted, so their range is an O(1) lookup and
+    histograms over any bin edges are binary searches instead of a pass over
+    every value. The summary depends on the reference window only, so it can
+    be reused while the current window changes.
+
+    Args:
+        reference_df: Reference data
+
+    Returns:
+        dict keyed by column name
+    """
+    summary = {}
+    for column in CONTINUOUS_COLUMNS:
+        if column in reference_df.columns:
+            values = reference_df[column].dropna().values.astype(float)
+            summary[column] = {
+                "sorted": np.sort(values),
+                "mean": float(np.mean(values)) if len(values) else 0.0,
+            }
+    if "predicted_class" in reference_df.columns:
+        summary["predicted_class"] = reference_df["predicted_class"].dropna().values
+    return summary
+
+
+def _aligned_category_counts(
+    reference: np.ndarray, current: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Per-category counts of both samples over the union of their categories.
+
+    One np.unique pass per sample, then a scatter into the sorted union, so
+    there is no per-category Python loop.
+
+    Returns:
+        (ref_counts, cur_counts) as float arrays aligned on sorted categories
+    """
+    ref_categories, ref_counts = np.unique(reference, return_counts=True)
+    cur_categories, cur_counts = np.unique(current, return_counts=True)
+    all_categories = np.union1d(ref_categories, cur_categories)
+
+    ref_aligned = np.zeros(len(all_categories))
+    cur_aligned = np.zeros(len(all_categories))
+    ref_aligned[np.searchsorted(all_categories, ref_categories)] = ref_counts
+    cur_aligned[np.searchsorted(all_categories, cur_categories)] = cur_counts
+    return ref_aligned, cur_aligned
+
+
+def _psi_sorted(ref_sorted: np.ndarray, current: np.ndarray, bins: int = 10) -> float:
+    """PSI against a pre-sorted reference (see population_stability_index)."""
+    breakpoints = _breakpoints(ref_sorted, current, bins)
+
+    ref_counts = _sorted_histogram(ref_sorted, breakpoints)
+    cur_counts, _ = np.histogram(current, bins=breakpoints)
+
+    ref_floor = 0.5 / len(ref_sorted)
+    cur_floor = 0.5 / len(current)
+
+    ref_pct = np.maximum(ref_counts / len(ref_sorted), ref_floor)
+    cur_pct = np.maximum(cur_counts / len(current), cur_floor)
+
+    psi = np.sum((cur_pct - ref_pct) * np.log(cur_pct / ref_pct))
+    return float(max(psi, 0.0))
+
+
+def _jsd_sorted(
+    ref_sorted: np.ndarray, current: np.ndarray, bins: int = 10, eps: float = 1e-6
+) -> float:
+    """JSD against a pre-sorted reference (see jensen_shannon_divergence)."""
+    breakpoints = _breakpoints(ref_sorted, current, bins)
+
+    ref_counts = _sorted_histogram(ref_sorted, breakpoints)
+    cur_counts, _ = np.histogram(current, bins=breakpoints)
+
+    ref_pct = ref_counts / ref_counts.sum() + eps
+    cur_pct = cur_counts / cur_counts.sum() + eps
+
+    # Normalize
+    ref_pct = ref_pct / ref_pct.sum()
+    cur_pct = cur_pct / cur_pct.sum()
+
+    m = 0.5 * (ref_pct + cur_pct)
+
+    jsd = 0.5 * np.sum(ref_pct * np.log(ref_pct / m)) + 0.5 * np.sum(
+        cur_pct * np.log(cur_pct / m)
+    )
+    return float(np.clip(jsd, 0, 1))
+
 
 def population_stability_index(
     reference: np.ndarray,
@@ -43,23 +163,7 @@ def population_stability_index(
     Returns:
         PSI score (float >= 0)
     """
-    breakpoints = np.linspace(
-        min(np.min(reference), np.min(current)),
-        max(np.max(reference), np.max(current)),
-        bins + 1,
-    )
-
-    ref_counts, _ = np.histogram(reference, bins=breakpoints)
-    cur_counts, _ = np.histogram(current, bins=breakpoints)
-
-    ref_floor = 0.5 / len(reference)
-    cur_floor = 0.5 / len(current)
-
-    ref_pct = np.maximum(ref_counts / len(reference), ref_floor)
-    cur_pct = np.maximum(cur_counts / len(current), cur_floor)
-
-    psi = np.sum((cur_pct - ref_pct) * np.log(cur_pct / ref_pct))
-    return float(max(psi, 0.0))
+    return _psi_sorted(np.sort(np.asarray(reference, dtype=float)), current, bins)
 
 
 def ks_test(reference: np.ndarray, current: np.ndarray) -> Dict:
@@ -94,19 +198,11 @@ def chi_square_test(
     Returns:
         dict with statistic, p_value, drift_detected
     """
-    # Get all unique categories
-    all_categories = np.union1d(np.unique(reference), np.unique(current))
-
-    ref_counts = pd.Series(reference).value_counts()
-    cur_counts = pd.Series(current).value_counts()
-
-    # Align both to all categories (fill missing with 0)
-    ref_aligned = np.array([ref_counts.get(c, 0) for c in all_categories], dtype=float)
-    cur_aligned = np.array([cur_counts.get(c, 0) for c in all_categories], dtype=float)
+    # Align both to all categories (missing categories count 0)
+    ref_aligned, cur_aligned = _aligned_category_counts(reference, current)
 
     # Only compare categories present in reference (ignore brand-new categories)
-    ref_categories = set(np.unique(reference))
-    mask = np.array([c in ref_categories for c in all_categories])
+    mask = ref_aligned > 0
 
     ref_filtered = ref_aligned[mask]
     cur_filtered = cur_aligned[mask]
@@ -155,29 +251,10 @@ def jensen_shannon_divergence(
     Returns:
         JSD score (0-1)
     """
-    breakpoints = np.linspace(
-        min(np.min(reference), np.min(current)),
-        max(np.max(reference), np.max(current)),
-        bins + 1,
+    return _jsd_sorted(
+        np.sort(np.asarray(reference, dtype=float)), current, bins, eps
     )
 
-    ref_counts, _ = np.histogram(reference, bins=breakpoints)
-    cur_counts, _ = np.histogram(current, bins=breakpoints)
-
-    ref_pct = ref_counts / ref_counts.sum() + eps
-    cur_pct = cur_counts / cur_counts.sum() + eps
-
-    # Normalize
-    ref_pct = ref_pct / ref_pct.sum()
-    cur_pct = cur_pct / cur_pct.sum()
-
-    m = 0.5 * (ref_pct + cur_pct)
-
-    jsd = 0.5 * np.sum(ref_pct * np.log(ref_pct / m)) + 0.5 * np.sum(
-        cur_pct * np.log(cur_pct / m)
-    )
-    return float(np.clip(jsd, 0, 1))
-
 
 def categorical_psi(
     reference: np.ndarray,
@@ -208,21 +285,14 @@ def categorical_psi(
     """
     n_ref = len(reference)
     n_cur = len(current)
-    all_categories = np.union1d(np.unique(reference), np.unique(current))
-    k = len(all_categories)
-
-    ref_counts = pd.Series(reference).value_counts()
-    cur_counts = pd.Series(current).value_counts()
+    ref_counts, cur_counts = _aligned_category_counts(reference, current)
+    k = len(ref_counts)
 
     ref_floor = 0.5 / n_ref
     cur_floor = 0.5 / n_cur
 
-    ref_pct = np.array(
-        [max(ref_counts.get(c, 0) / n_ref, ref_floor) for c in all_categories]
-    )
-    cur_pct = np.array(
-        [max(cur_counts.get(c, 0) / n_cur, cur_floor) for c in all_categories]
-    )
+    ref_pct = np.maximum(ref_counts / n_ref, ref_floor)
+    cur_pct = np.maximum(cur_counts / n_cur, cur_floor)
 
     raw_psi = float(np.sum((cur_pct - ref_pct) * np.log(cur_pct / ref_pct)))
     bias = (k - 1) * (1.0 / n_ref + 1.0 / n_cur)
@@ -232,6 +302,7 @@ def categorical_psi(
 def compute_drift_scores(
     reference_df: pd.DataFrame,
     current_df: pd.DataFrame,
+    reference_summary: Dict = None,
 ) -> Dict:
     """
     Compute comprehensive drift scores across multiple dimensions.
@@ -244,6 +315,8 @@ def compute_drift_scores(
     Args:
         reference_df: Reference data (training or earlier inference window)
         current_df: Current data (recent inferences)
+        reference_summary: Output of summarize_reference(reference_df), if
+            already available
 
     Returns:
         dict with per-dimension scores and overall drift assessment
@@ -256,24 +329,27 @@ def compute_drift_scores(
         "drift_detected": False,
     }
 
+    if reference_summary is None:
+        reference_summary = summarize_reference(reference_df)
+
     # -- Data drift: text_length --
-    if "text_length" in reference_df.columns and "text_length" in current_df.columns:
-        ref_len = reference_df["text_length"].dropna().values.astype(float)
+    if "text_length" in reference_summary and "text_length" in current_df.columns:
+        ref_len = reference_summary["text_length"]["sorted"]
         cur_len = current_df["text_length"].dropna().values.astype(float)
 
         if len(ref_len) > 0 and len(cur_len) > 0:
             results["data_drift"] = {
-                "psi": population_stability_index(ref_len, cur_len),
+                "psi": _psi_sorted(ref_len, cur_len),
                 "ks": ks_test(ref_len, cur_len),
-                "jsd": jensen_shannon_divergence(ref_len, cur_len),
+                "jsd": _jsd_sorted(ref_len, cur_len),
             }
 
     # -- Prediction drift: predicted_class distribution --
     if (
-        "predicted_class" in reference_df.columns
+        "predicted_class" in reference_summary
         and "predicted_class" in current_df.columns
     ):
-        ref_pred = reference_df["predicted_class"].dropna().values
+        ref_pred = reference_summary["predicted_class"]
         cur_pred = current_df["predicted_class"].dropna().values
 
         if len(ref_pred) > 0 and len(cur_pred) > 0:
@@ -283,17 +359,18 @@ def compute_drift_scores(
             }
 
     # -- Confidence drift --
-    if "confidence" in reference_df.columns and "confidence" in current_df.columns:
-        ref_conf = reference_df["confidence"].dropna().values.astype(float)
+    if "confidence" in reference_summary and "confidence" in current_df.columns:
+        ref_conf = reference_summary["confidence"]["sorted"]
+        mean_ref = reference_summary["confidence"]["mean"]
         cur_conf = current_df["confidence"].dropna().values.astype(float)
 
         if len(ref_conf) > 0 and len(cur_conf) > 0:
             results["confidence_drift"] = {
-                "psi": population_stability_index(ref_conf, cur_conf),
+                "psi": _psi_sorted(ref_conf, cur_conf),
                 "ks": ks_test(ref_conf, cur_conf),
-                "mean_ref": float(np.mean(ref_conf)),
+                "mean_ref": mean_ref,
                 "mean_cur": float(np.mean(cur_conf)),
-                "mean_delta": float(np.mean(cur_conf) - np.mean(ref_conf)),
+                "mean_delta": float(np.mean(cur_conf) - mean_ref),
             }
 
     # -- Overall drift score (weighted average of PSI scores) --
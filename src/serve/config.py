@@ -24,6 +24,19 @@ INFERENCE_LOG_PATH = os.getenv(
 )
 INFERENCE_LOG_MAX_ROWS = int(os.getenv("INFERENCE_LOG_MAX_ROWS", "100000"))
 
+# Columnar copy of the log read by drift monitoring, partitioned as
+# date=YYYY-MM-DD/hour=HH/part-*.parquet (defaults to the CSV path sans suffix)
+INFERENCE_LOG_DATASET_PATH = os.getenv(
+    "INFERENCE_LOG_DATASET_PATH", str(Path(INFERENCE_LOG_PATH).with_suffix(""))
+)
+# Buffered rows become a Parquet part when either bound is reached, so low
+# traffic still reaches the drift monitor within INFERENCE_LOG_FLUSH_SECONDS
+INFERENCE_LOG_FLUSH_ROWS = int(os.getenv("INFERENCE_LOG_FLUSH_ROWS", "100"))
+INFERENCE_LOG_FLUSH_SECONDS = float(os.getenv("INFERENCE_LOG_FLUSH_SECONDS", "60"))
+# Date partitions older than this are deleted; the default covers the drift
+# monitor's 30-day reference window plus the partition it reads before it
+INFERENCE_LOG_RETENTION_DAYS = int(os.getenv("INFERENCE_LOG_RETENTION_DAYS", "31"))
+
 # PostgreSQL Configuration (optional, for dataset stats)
 POSTGRES_HOST = os.getenv("POSTGRES_HOST", "postgres")
 POSTGRES_PORT = int(os.getenv("POSTGRES_PORT", "5432"))
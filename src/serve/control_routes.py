@@ -198,7 +198,7 @@ async def trigger_retrain():
         promoted_msg = (
             f"Model v{result['model_version']} promoted to Production"
             if promo["promoted"]
-            else f"Model v{result['model_version']} archived: {promo.get('reason')}"
+            else f"Model v{result['model_version']} {promo['decision'].replace('_', ' ')}: {promo.get('reason')}"
         )
 
         return TriggerRetrainResponse(
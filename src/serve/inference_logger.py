@@ -1,28 +1,77 @@
 """
 Inference Logger
 
-Logs predictions to CSV for drift monitoring with Evidently.
+Logs predictions to CSV for drift monitoring with Evidently, plus an
+append-only, hour-partitioned Parquet copy read by the drift monitor
+(date partitions past INFERENCE_LOG_RETENTION_DAYS are pruned).
 """
 import csv
 import os
-from datetime import datetime
+import shutil
+import threading
+import uuid
+from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Dict
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 import config
 import logging
 
 logger = logging.getLogger(__name__)
 
+PARQUET_SCHEMA = pa.schema(
+    [
+        ("timestamp", pa.timestamp("us")),
+        ("prediction_id", pa.string()),
+        ("designation", pa.string()),
+        ("description", pa.string()),
+        ("predicted_class", pa.int64()),
+        ("confidence", pa.float32()),
+        ("text_length", pa.int32()),
+        ("model_version", pa.string()),
+        ("model_stage", pa.string()),
+    ]
+)
+
 
 class InferenceLogger:
     """Logger for inference predictions"""
 
-    def __init__(self, log_path: str = None):
+    def __init__(
+        self, log_path: str = None, dataset_path: str = None, flush_seconds: float = None
+    ):
         self.log_path = log_path or config.INFERENCE_LOG_PATH
+        if dataset_path is None:
+            dataset_path = (
+                config.INFERENCE_LOG_DATASET_PATH
+                if log_path is None
+                else Path(log_path).with_suffix("")
+            )
+        self.dataset_path = Path(dataset_path)
         self.max_rows = config.INFERENCE_LOG_MAX_ROWS
+        self.retention_days = config.INFERENCE_LOG_RETENTION_DAYS
+        self._pruned_date = None
+        self.flush_rows = config.INFERENCE_LOG_FLUSH_ROWS
+        self.flush_seconds = (
+            config.INFERENCE_LOG_FLUSH_SECONDS if flush_seconds is None else flush_seconds
+        )
+        self._buffer = []
+        self._buffer_lock = threading.Lock()
+        self._backfill_dataset()
         self._ensure_log_file()
 
+        # Time-bound flush: without it a quiet worker would hold rows in
+        # memory until the row bound or the next hour
+        self._stop_flusher = threading.Event()
+        self._flusher = None
+        if self.flush_seconds > 0:
+            self._flusher = threading.Thread(
+                target=self._flush_periodically, name="inference-log-flush", daemon=True
+            )
+            self._flusher.start()
+
     def _ensure_log_file(self):
         """Ensure log file exists with headers"""
         Path(self.log_path).parent.mkdir(parents=True, exist_ok=True)
@@ -46,6 +95,37 @@ class InferenceLogger:
                 )
             logger.info(f"Created inference log at {self.log_path}")
 
+    def _backfill_dataset(self):
+        """Seed the Parquet log from existing CSV history (first start only)"""
+        if not os.path.exists(self.log_path):
+            return
+
+        try:
+            # mkdir doubles as a lock between API workers starting together
+            self.dataset_path.mkdir(parents=True, exist_ok=False)
+        except FileExistsError:
+            return
+
+        try:
+            df = pd.read_csv(self.log_path, dtype=str, keep_default_na=False)
+            df["timestamp"] = pd.to_datetime(df["timestamp"], errors="coerce")
+            df = df.dropna(subset=["timestamp"])
+            for column in ("predicted_class", "confidence", "text_length"):
+                df[column] = pd.to_numeric(df[column], errors="coerce")
+
+            for _, hour_df in df.groupby(df["timestamp"].dt.floor("h")):
+                table = pa.Table.from_pandas(
+                    hour_df[PARQUET_SCHEMA.names],
+                    schema=PARQUET_SCHEMA,
+                    preserve_index=False,
+                    safe=False,
+                )
+                self._write_part(table, hour_df["timestamp"].iloc[0])
+
+            logger.info(f"Backfilled {len(df)} rows into Parquet log {self.dataset_path}")
+        except Exception as e:
+            logger.error(f"Failed to backfill Parquet log from CSV: {e}")
+
     def log_prediction(
         self,
         prediction_id: str,
@@ -59,23 +139,24 @@ class InferenceLogger:
         """Log a single prediction"""
         try:
             text_length = len(designation) + len(description)
-            timestamp = datetime.utcnow().isoformat()
+            now = datetime.utcnow()
+            row = [
+                now,
+                prediction_id,
+                designation[:100],  # Truncate for CSV
+                description[:500],  # Truncate for CSV
+                predicted_class,
+                confidence,
+                text_length,
+                model_version,
+                model_stage,
+            ]
 
             with open(self.log_path, "a", newline="") as f:
                 writer = csv.writer(f)
-                writer.writerow(
-                    [
-                        timestamp,
-                        prediction_id,
-                        designation[:100],  # Truncate for CSV
-                        description[:500],  # Truncate for CSV
-                        predicted_class,
-                        confidence,
-                        text_length,
-                        model_version,
-                        model_stage,
-                    ]
-                )
+                writer.writerow([now.isoformat()] + row[1:])
+
+            self._buffer_row(row)
 
             # Rotate if exceeds max rows
             self._rotate_if_needed()
@@ -83,6 +164,82 @@ class InferenceLogger:
         except Exception as e:
             logger.error(f"Failed to log prediction: {e}")
 
+    def _buffer_row(self, row: list):
+        """Buffer a row for the Parquet log, flushing full or past-hour buffers"""
+        hour = row[0].replace(minute=0, second=0, microsecond=0)
+        with self._buffer_lock:
+            if self._buffer and self._buffer[0][0] < hour:
+                self._flush_locked()
+            self._buffer.append(row)
+            if len(self._buffer) >= self.flush_rows:
+                self._flush_locked()
+
+    def flush(self):
+        """Write buffered rows to the Parquet log"""
+        with self._buffer_lock:
+            self._flush_locked()
+
+    def _flush_periodically(self):
+        """Flush the buffer every flush_seconds until close()"""
+        while not self._stop_flusher.wait(self.flush_seconds):
+            self.flush()
+
+    def close(self):
+        """Stop the flush thread and write what is still buffered"""
+        self._stop_flusher.set()
+        if self._flusher is not None:
+            self._flusher.join()
+        self.flush()
+
+    def _flush_locked(self):
+        """Write the buffer as one part file of its hour partition (lock held)"""
+        if not self._buffer:
+            return
+
+        rows, self._buffer = self._buffer, []
+        try:
+            columns = list(zip(*rows))
+            table = pa.Table.from_arrays(
+                [pa.array(col, type=field.type) for col, field in zip(columns, PARQUET_SCHEMA)],
+                schema=PARQUET_SCHEMA,
+            )
+            self._write_part(table, rows[0][0])
+        except Exception as e:
+            logger.error(f"Failed to flush {len(rows)} rows to Parquet log: {e}")
+
+        # Once per day of writes: the CSV is bounded by rotation, this
+        # bounds the Parquet log
+        if rows[0][0].date() != self._pruned_date:
+            self._pruned_date = rows[0][0].date()
+            self._prune_partitions()
+
+    def _prune_partitions(self):
+        """Delete date partitions older than retention_days"""
+        cutoff = f"date={datetime.utcnow().date() - timedelta(days=self.retention_days)}"
+        try:
+            for partition in self.dataset_path.glob("date=*"):
+                # date=YYYY-MM-DD names sort chronologically
+                if partition.name < cutoff:
+                    shutil.rmtree(partition, ignore_errors=True)
+                    logger.info(f"Pruned Parquet log partition {partition.name}")
+        except Exception as e:
+            logger.warning(f"Failed to prune Parquet log: {e}")
+
+    def _write_part(self, table: pa.Table, first_ts: datetime):
+        """Write one part file (one row group) into its hour partition"""
+        partition = (
+            self.dataset_path
+            / f"date={first_ts:%Y-%m-%d}"
+            / f"hour={first_ts:%H}"
+        )
+        partition.mkdir(parents=True, exist_ok=True)
+
+        tmp_file = partition / f".part-{uuid.uuid4().hex}.tmp"
+        pq.write_table(table, tmp_file, compression="zstd")
+        # Rename into place so readers never see a half-written file
+        part_file = partition / f"part-{first_ts:%M%S}-{uuid.uuid4().hex[:8]}.parquet"
+        os.replace(tmp_file, part_file)
+
     def _rotate_if_needed(self):
         """Rotate log file if it exceeds max rows"""
         try:
@@ -72,6 +72,11 @@ async def shutdown_event():
     """Shutdown event handler"""
     logger.info("Rakuten API shutting down...")
 
+    # Persist predictions still buffered for the Parquet log
+    from inference_logger import inference_logger
+
+    inference_logger.close()
+
 
 if __name__ == "__main__":
     import uvicorn
@@ -23,11 +23,11 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 try:
-    from src.utils.text_preprocessing import preprocess_text
+    from src.utils.text_preprocessing import input_text_infer
 except ImportError:
     # Fallback simple preprocessing
-    def preprocess_text(text: str) -> str:
-        return text.lower().strip()
+    def input_text_infer(designation: str, description: str | None = None) -> str:
+        return f"{designation} {description or ''}".lower().strip()
 
 logger = logging.getLogger(__name__)
 
@@ -92,10 +92,8 @@ async def predict(request: PredictionRequest):
                 detail="Model not loaded. Check /health endpoint.",
             )
 
-        # Preprocess text
-        designation_clean = preprocess_text(request.designation)
-        description_clean = preprocess_text(request.description)
-        combined_text = f"{designation_clean} {description_clean}"
+        # Preprocess text (same cleaning as the training features)
+        combined_text = input_text_infer(request.designation, request.description)
 
         # Transform text to features
         if vectorizer is not None:
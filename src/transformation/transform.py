@@ -11,9 +11,11 @@ import os
 
 import pandas as pd
 import psycopg2
+import pyarrow as pa
 from airflow.providers.amazon.aws.hooks.s3 import S3Hook
 from psycopg2.extras import execute_values
 
+from src.data.bulk import copy_query_to_arrow
 from utils.text_preprocessing import input_text_train
 
 logger = logging.getLogger(__name__)
@@ -21,6 +23,17 @@ logger = logging.getLogger(__name__)
 MINIO_CONN_ID = "minio_s3"
 IMAGES_BUCKET = "dvc-storage"
 
+# raw_products columns read by the transformation, in SELECT order
+RAW_COLUMNS = pa.schema([
+    ("productid", pa.int64()),
+    ("imageid", pa.int64()),
+    ("prdtypecode", pa.int64()),
+    ("prodtype", pa.string()),
+    ("product_designation", pa.string()),
+    ("product_description", pa.string()),
+    ("batch_id", pa.string()),
+])
+
 
 def get_pg_conn():
     """Create PostgreSQL connection using psycopg2."""
@@ -33,17 +46,24 @@ def get_pg_conn():
     )
 
 
+def image_filenames(df: pd.DataFrame) -> pd.Series:
+    """Image file name per row, built column-wise (no per-row Python call)."""
+    return (
+        "image_"
+        + df["imageid"].astype("int64").astype(str)
+        + "_product_"
+        + df["productid"].astype("int64").astype(str)
+        + ".jpg"
+    )
+
+
 def check_images_exist(df: pd.DataFrame) -> pd.Series:
     """Check which images exist in MinIO."""
     hook = S3Hook(aws_conn_id=MINIO_CONN_ID)
     existing_keys = hook.list_keys(bucket_name=IMAGES_BUCKET, prefix="images/") or []
     existing_filenames = {os.path.basename(k) for k in existing_keys}
 
-    image_filenames = df.apply(
-        lambda row: f"image_{int(row['imageid'])}_product_{int(row['productid'])}.jpg",
-        axis=1,
-    )
-    return image_filenames.isin(existing_filenames)
+    return image_filenames(df).isin(existing_filenames)
 
 
 def run_transformation(**context) -> dict:
@@ -57,24 +77,31 @@ def run_transformation(**context) -> dict:
 
     logger.info(f"Transforming batch: {batch_id}")
 
+    # One connection for the dedup check and the batch read
     conn = get_pg_conn()
-    cursor = conn.cursor()
-    cursor.execute(
-        "SELECT COUNT(*) FROM processed_products WHERE batch_id = %s", (batch_id,)
-    )
-    count = cursor.fetchone()[0]
-    cursor.close()
-    conn.close()
-
-    if count > 0:
-        logger.warning(f"Batch {batch_id} already transformed ({count} rows), skipping")
-        return {"batch_id": batch_id, "rows": 0}
-
-    # Read batch from raw_products
-    conn = get_pg_conn()
-    query = f"SELECT * FROM raw_products WHERE batch_id = '{batch_id}'"
-    df = pd.read_sql(query, conn)
-    conn.close()
+    try:
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT COUNT(*) FROM processed_products WHERE batch_id = %s", (batch_id,)
+        )
+        count = cursor.fetchone()[0]
+        cursor.close()
+
+        if count > 0:
+            logger.warning(f"Batch {batch_id} already transformed ({count} rows), skipping")
+            return {"batch_id": batch_id, "rows": 0}
+
+        # Read batch from raw_products: only the columns used below, streamed
+        # through COPY into Arrow instead of one Python tuple per row
+        cursor = conn.cursor()
+        query = cursor.mogrify(
+            f"SELECT {', '.join(RAW_COLUMNS.names)} FROM raw_products WHERE batch_id = %s",
+            (batch_id,),
+        ).decode()
+        df = copy_query_to_arrow(cursor, query, RAW_COLUMNS).to_pandas(self_destruct=True)
+        cursor.close()
+    finally:
+        conn.close()
     logger.info(f"Read {len(df)} rows from raw_products")
 
     if df.empty:
@@ -88,12 +115,7 @@ def run_transformation(**context) -> dict:
     logger.info("Text cleaning applied")
 
     # Build MinIO image paths
-    df["path_image_minio"] = df.apply(
-        lambda row: (
-            f"s3://{IMAGES_BUCKET}/images/image_{int(row['imageid'])}_product_{int(row['productid'])}.jpg"
-        ),
-        axis=1,
-    )
+    df["path_image_minio"] = f"s3://{IMAGES_BUCKET}/images/" + image_filenames(df)
 
     # Check image existence in MinIO
     df["image_exists"] = check_images_exist(df)
@@ -114,7 +136,8 @@ def run_transformation(**context) -> dict:
         "batch_id",
     ]
 
-    values = [tuple(row[col] for col in columns) for _, row in df.iterrows()]
+    # Column-wise tolist() gives native Python values without a Series per row
+    values = list(zip(*(df[col].tolist() for col in columns)))
 
     conn = get_pg_conn()
     cursor = conn.cursor()
@@ -124,6 +147,8 @@ def run_transformation(**context) -> dict:
         VALUES %s
     """
 
+    # Bulk load: let the commit return without waiting for the WAL fsync
+    cursor.execute("SET LOCAL synchronous_commit = OFF")
     execute_values(cursor, insert_query, values, page_size=1000)
     conn.commit()
     cursor.close()
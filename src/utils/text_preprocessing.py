@@ -4,6 +4,7 @@ Text Preprocessing Utilities :
     - Aggressive cleaning using pre-compiled Regex.
     - Usage:
         - `clean_text`: Low-level cleaner.
+        - `clean_text_series`: Column-wise cleaner (pyarrow compute kernels).
         - `input_text_train`: Bulk processing for DataFrames.
         - `input_text_infer`: Fast processing for API requests.
 """
@@ -12,10 +13,25 @@ import html
 import re
 from typing import Any
 
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from joblib import Parallel, delayed, effective_n_jobs
+
+try:
+    import re2
+except ImportError:
+    # google-re2 is optional; `re` gives identical results, just slower
+    re2 = None
 
 # Regex patterns
-REGEX_HTML = re.compile(r"<[^>]+>")
+HTML_PATTERN = r"<[^>]+>"
+# An unclosed "<" makes backtracking `re` rescan to the end of the text from
+# every "<"; RE2 matches in linear time. The pattern has no \s/\w/\b, so
+# both engines agree on it.
+REGEX_HTML = (re2 or re).compile(HTML_PATTERN)
 REGEX_URL = re.compile(r"http[s]?://\S+|www\.\S+")
 REGEX_EMAIL = re.compile(r"\b[\w\.-]+@[\w\.-]+\.\w+\b")
 REGEX_PRODUCT_REF = re.compile(
@@ -24,7 +40,31 @@ REGEX_PRODUCT_REF = re.compile(
 )
 REGEX_CODE = re.compile(r"[a-zA-Z]{2,}-\d+(?:-[a-zA-Z]{2,})?")
 REGEX_LONG_NUM = re.compile(r"\b\d{6,}\b")
-REGEX_SPACES = re.compile(r"\s+")
+
+# RE2 (pyarrow) equivalents, only for passes whose semantics match Python `re`.
+# RE2's \s is ASCII-only, so Unicode whitespace is folded to " " first.
+_UNICODE_SPACES = "".join(chr(c) for c in range(0x3001) if chr(c).isspace())
+ARROW_UNICODE_SPACES = (
+    "[" + "".join(f"\\x{{{ord(c):x}}}" for c in _UNICODE_SPACES) + "]"
+)
+ARROW_HTML = HTML_PATTERN
+ARROW_URL = REGEX_URL.pattern
+
+# Cheap RE2 pre-filters (supersets of each Python pattern's matches): only the
+# rows they flag go through the Python regex.
+PYTHON_PASSES = (
+    (REGEX_EMAIL, "@"),
+    (
+        REGEX_PRODUCT_REF,
+        "ref|réf|reference|référence|fabricant|model|modèle|sku|asin|ean|isbn|gtin",
+    ),
+    (REGEX_CODE, r"[a-zA-Z]{2}-\p{Nd}"),
+    (REGEX_LONG_NUM, r"\p{Nd}{6}"),
+)
+
+
+# Below this, worker start-up costs more than the cleaning itself
+PARALLEL_MIN_ROWS = 20_000
 
 
 def clean_text(text: str | Any = None) -> str:
@@ -38,8 +78,54 @@ def clean_text(text: str | Any = None) -> str:
     text = REGEX_PRODUCT_REF.sub(" ", text)
     text = REGEX_CODE.sub(" ", text)
     text = REGEX_LONG_NUM.sub(" ", text)
-    text = REGEX_SPACES.sub(" ", text).strip()
-    return text
+    # str.split() uses the same Unicode whitespace set as `\s+`, without a
+    # regex pass or a separate strip()
+    return " ".join(text.split())
+
+
+def clean_text_series(texts: pd.Series, n_jobs: int = 1) -> pd.Series:
+    """Clean a whole text column; same output as `clean_text` row by row.
+
+    Tag/URL stripping and whitespace collapsing run as pyarrow compute
+    kernels over the column. Patterns relying on Unicode word boundaries
+    (emails, references, codes, long numbers) have no RE2 equivalent and
+    stay on the pre-compiled Python regexes.
+
+    With n_jobs != 1 (joblib semantics, -1 = all cores), columns of at least
+    PARALLEL_MIN_ROWS rows are split into contiguous chunks cleaned in
+    worker processes.
+    """
+    n_jobs = effective_n_jobs(n_jobs)
+    if n_jobs > 1 and len(texts) >= PARALLEL_MIN_ROWS:
+        bounds = np.linspace(0, len(texts), n_jobs + 1, dtype=int)
+        chunks = Parallel(n_jobs=n_jobs)(
+            delayed(clean_text_series)(texts.iloc[start:stop])
+            for start, stop in zip(bounds[:-1], bounds[1:])
+        )
+        return pd.concat(chunks)
+
+    values = [
+        "" if text is None or pd.isna(text) else html.unescape(str(text)).lower()
+        for text in texts.tolist()
+    ]
+    arr = pa.array(values, type=pa.string())
+    arr = pc.replace_substring_regex(arr, ARROW_UNICODE_SPACES, " ")
+    arr = pc.replace_substring_regex(arr, ARROW_HTML, " ")
+    arr = pc.replace_substring_regex(arr, ARROW_URL, " ")
+
+    for regex, prefilter in PYTHON_PASSES:
+        mask = pc.match_substring_regex(arr, prefilter)
+        if not pc.any(mask).as_py():
+            continue
+        rows = pc.indices_nonzero(mask)
+        cleaned = [regex.sub(" ", text) for text in arr.take(rows).to_pylist()]
+        values = arr.to_numpy(zero_copy_only=False)
+        values[rows.to_numpy()] = cleaned
+        arr = pa.array(values, type=pa.string())
+
+    arr = pc.replace_substring_regex(arr, r" +", " ")
+    arr = pc.utf8_trim(arr, " ")
+    return pd.Series(arr.to_pylist(), index=texts.index, dtype=object)
 
 
 def input_text_train(
@@ -48,8 +134,8 @@ def input_text_train(
     col_desc: str = "product_description",
 ) -> pd.DataFrame:
     """Clean designation and description, build text_tr for training."""
-    df["designation_tr"] = df[col_des].apply(clean_text)
-    df["description_tr"] = df[col_desc].apply(clean_text)
+    df["designation_tr"] = clean_text_series(df[col_des], n_jobs=-1)
+    df["description_tr"] = clean_text_series(df[col_desc], n_jobs=-1)
     df["text_tr"] = (
         df["designation_tr"].str.cat(df["description_tr"], sep=" ").str.strip()
     )
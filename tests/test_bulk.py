@@ -0,0 +1,122 @@
+"""
+Unit tests for src/data/bulk.py
+"""
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+import src.data.bulk as bulk
+from src.data.bulk import (
+    copy_dataframe,
+    copy_insert_ignore_conflicts,
+    copy_query_to_arrow,
+    insert_ignore_conflicts,
+)
+
+
+class FakeCursor:
+    """Records statements and COPY payloads instead of talking to PostgreSQL."""
+
+    def __init__(self, rowcount=0):
+        self.statements = []
+        self.copies = []
+        self.rowcount = rowcount
+
+    def execute(self, sql, params=None):
+        self.statements.append(" ".join(sql.split()))
+
+    def copy_expert(self, sql, buffer):
+        self.copies.append((" ".join(sql.split()), buffer.read()))
+
+
+class TestCopyDataframe:
+    """Tests for the COPY FROM STDIN helpers."""
+
+    def test_copy_streams_selected_columns_as_csv(self):
+        df = pd.DataFrame(
+            {"productid": [1, 2], "designation": ["a,b", "c"], "extra": [0, 0]}
+        )
+        cursor = FakeCursor()
+
+        copy_dataframe(cursor, df, "products", ["productid", "designation"])
+
+        sql, payload = cursor.copies[0]
+        assert sql.startswith("COPY products (productid, designation) FROM STDIN")
+        assert payload == '1,"a,b"\n2,c\n'
+
+    def test_missing_values_become_null_marker(self):
+        df = pd.DataFrame({"designation": ["x", ""], "description": [None, "y"]})
+        cursor = FakeCursor()
+
+        copy_dataframe(cursor, df, "products", ["designation", "description"])
+
+        _, payload = cursor.copies[0]
+        assert payload == "x,\\N\n,y\n"
+
+    def test_insert_ignore_conflicts_goes_through_staging(self):
+        df = pd.DataFrame({"productid": [1, 2], "prdtypecode": [10, 20]})
+        cursor = FakeCursor(rowcount=2)
+
+        inserted = copy_insert_ignore_conflicts(
+            cursor, df, "labels", ["productid", "prdtypecode"], "productid"
+        )
+
+        assert inserted == 2
+        assert cursor.copies[0][0].startswith("COPY stg_labels")
+        assert cursor.statements[-1] == (
+            "INSERT INTO labels (productid, prdtypecode) "
+            "SELECT productid, prdtypecode FROM stg_labels "
+            "ON CONFLICT (productid) DO NOTHING"
+        )
+
+    def test_insert_fallback_sends_native_row_tuples(self, monkeypatch):
+        sent = {}
+
+        def fake_execute_values(cursor, sql, rows, page_size, fetch):
+            sent["rows"] = rows
+            return [(1,)] * len(rows)
+
+        monkeypatch.setattr(bulk, "execute_values", fake_execute_values)
+        df = pd.DataFrame(
+            {"productid": [1, 2], "description": ["x", np.nan], "extra": [0, 0]}
+        )
+
+        inserted = insert_ignore_conflicts(
+            FakeCursor(), df, "products", ["productid", "description"], "productid"
+        )
+
+        assert inserted == 2
+        assert sent["rows"] == [(1, "x"), (2, None)]
+        assert type(sent["rows"][0][0]) is int
+
+
+class TestCopyQueryToArrow:
+    """Tests for reading query results through COPY TO STDOUT."""
+
+    def test_parses_copy_csv_output(self):
+        class CopyOutCursor:
+            def copy_expert(self, sql, buffer):
+                self.sql = sql
+                # PostgreSQL COPY CSV: NULL unquoted, empty string quoted
+                buffer.write(b'1,"multi\nline",,t\n2,"",x,f\n')
+
+        schema = pa.schema(
+            [
+                ("productid", pa.int64()),
+                ("designation", pa.string()),
+                ("description", pa.string()),
+                ("flag", pa.bool_()),
+            ]
+        )
+        cursor = CopyOutCursor()
+
+        table = copy_query_to_arrow(cursor, "SELECT * FROM products", schema)
+
+        assert cursor.sql.startswith("COPY (SELECT * FROM products) TO STDOUT")
+        assert table.schema == schema
+        assert table.to_pydict() == {
+            "productid": [1, 2],
+            "designation": ["multi\nline", ""],
+            "description": [None, "x"],
+            "flag": [True, False],
+        }
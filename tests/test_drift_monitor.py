@@ -82,3 +82,74 @@ class TestDriftMonitor:
         assert report["overall_drift_score"] == 0.12
         assert report["severity"] == "WARNING"
         assert "report_date" in report
+
+    def test_parquet_dataset_preferred_over_csv(self, tmp_path):
+        """Hour-partitioned Parquet log is read instead of the CSV."""
+        now = pd.Timestamp.utcnow().tz_localize(None).floor("h")
+        df = pd.DataFrame(
+            {
+                "timestamp": [now - pd.Timedelta(days=60), now, now],
+                "designation": ["prod"] * 3,
+                "predicted_class": [10, 20, 20],
+                "confidence": np.array([0.5, 0.7, 0.9], dtype="float32"),
+                "text_length": [10, 20, 30],
+            }
+        )
+        partition = tmp_path / "log" / f"date={now:%Y-%m-%d}" / f"hour={now:%H}"
+        partition.mkdir(parents=True)
+        df.to_parquet(partition / "part-0.parquet", index=False)
+        (tmp_path / "log.csv").write_text("timestamp,predicted_class\n")
+
+        monitor = DriftMonitor(inference_log_path=str(tmp_path / "log.csv"))
+        loaded = monitor._load_inference_log()
+
+        # Rows older than the reference window are filtered out in Arrow
+        assert len(loaded) == 2
+        assert list(loaded.columns) == [
+            "timestamp", "predicted_class", "confidence", "text_length"
+        ]
+
+    def test_count_samples_without_parquet_log(self, tmp_path):
+        """CSV-only logs cannot be counted without a read."""
+        monitor = DriftMonitor(inference_log_path=str(tmp_path / "log.csv"))
+        assert monitor.count_samples() is None
+
+    def test_csv_with_bad_timestamp_falls_back_to_pandas(self, tmp_path):
+        """Rows Arrow cannot convert are dropped instead of failing the read."""
+        log_file = tmp_path / "log.csv"
+        log_file.write_text(
+            "timestamp,prediction_id,designation,description,"
+            "predicted_class,confidence,text_length,model_version,model_stage\n"
+            '2026-02-10T10:00:00.123456,p1,"multi\nline",d,10,0.5,12,1,Production\n'
+            "not-a-date,p2,x,d,20,0.7,8,1,Production\n"
+        )
+        monitor = DriftMonitor(inference_log_path=str(log_file))
+        loaded = monitor._load_inference_log()
+
+        assert len(loaded) == 1
+        assert loaded["predicted_class"].tolist() == [10]
+
+    def test_partitions_outside_windows_are_not_opened(self, tmp_path):
+        """Only date partitions inside the reference window are read."""
+        now = pd.Timestamp.utcnow().tz_localize(None).floor("h")
+        recent = tmp_path / "log" / f"date={now:%Y-%m-%d}" / f"hour={now:%H}"
+        recent.mkdir(parents=True)
+        pd.DataFrame(
+            {
+                "timestamp": [now, now],
+                "predicted_class": [10, 20],
+                "confidence": np.array([0.5, 0.7], dtype="float32"),
+                "text_length": [10, 20],
+            }
+        ).to_parquet(recent / "part-0.parquet", index=False)
+
+        # Unreadable file in an old partition: opening it would fail the read
+        old = now - pd.Timedelta(days=90)
+        stale = tmp_path / "log" / f"date={old:%Y-%m-%d}" / f"hour={old:%H}"
+        stale.mkdir(parents=True)
+        (stale / "part-0.parquet").write_bytes(b"not parquet")
+
+        monitor = DriftMonitor(inference_log_path=str(tmp_path / "log.csv"))
+
+        assert monitor.count_samples() == 2
+        assert len(monitor._load_inference_log()) == 2
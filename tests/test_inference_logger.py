@@ -0,0 +1,107 @@
+"""
+Unit tests for src/serve/inference_logger.py
+"""
+import importlib
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+from src.monitoring.drift_monitor import DriftMonitor
+
+SERVE_DIR = Path(__file__).parent.parent / "src" / "serve"
+
+
+@pytest.fixture
+def InferenceLogger(monkeypatch, tmp_path):
+    """
+    InferenceLogger class from a fresh import of the serve modules.
+
+    src/serve imports its flat `config` module and builds a module-level
+    logger at import, so the default log is pointed at tmp_path first; the
+    env var, sys.path entry and imported modules are undone afterwards.
+    """
+    monkeypatch.setenv(
+        "INFERENCE_LOG_PATH", str(tmp_path / "default" / "inference_log.csv")
+    )
+    monkeypatch.syspath_prepend(str(SERVE_DIR))
+    for name in ("config", "inference_logger"):
+        monkeypatch.delitem(sys.modules, name, raising=False)
+
+    module = importlib.import_module("inference_logger")
+    yield module.InferenceLogger
+
+    module.inference_logger.close()
+    for name in ("config", "inference_logger"):
+        sys.modules.pop(name, None)
+
+
+class TestInferenceLoggerFlush:
+    """Buffered predictions reach the Parquet log without an explicit flush."""
+
+    def test_rows_become_countable_after_flush_interval(self, InferenceLogger, tmp_path):
+        log_path = tmp_path / "inference_log.csv"
+        inference_logger = InferenceLogger(log_path=str(log_path), flush_seconds=0.05)
+        monitor = DriftMonitor(inference_log_path=str(log_path))
+        try:
+            inference_logger.log_prediction(
+                prediction_id="pred_1",
+                designation="Jouet",
+                description="En bois",
+                predicted_class=10,
+                confidence=0.9,
+                model_version="1",
+                model_stage="Production",
+            )
+
+            deadline = time.monotonic() + 5
+            while monitor.count_samples() != 1 and time.monotonic() < deadline:
+                time.sleep(0.05)
+
+            assert monitor.count_samples() == 1
+        finally:
+            inference_logger.close()
+
+    def test_close_writes_buffered_rows(self, InferenceLogger, tmp_path):
+        log_path = tmp_path / "inference_log.csv"
+        inference_logger = InferenceLogger(log_path=str(log_path), flush_seconds=0)
+        inference_logger.log_prediction(
+            prediction_id="pred_1",
+            designation="Jouet",
+            description="En bois",
+            predicted_class=10,
+            confidence=0.9,
+            model_version="1",
+            model_stage="Production",
+        )
+
+        inference_logger.close()
+
+        assert DriftMonitor(inference_log_path=str(log_path)).count_samples() == 1
+
+
+class TestInferenceLoggerRetention:
+    """Date partitions past the retention window are deleted."""
+
+    def test_old_date_partitions_are_pruned(self, InferenceLogger, tmp_path):
+        log_path = tmp_path / "inference_log.csv"
+        dataset_path = tmp_path / "inference_log"
+        old = dataset_path / "date=2000-01-01" / "hour=00"
+        old.mkdir(parents=True)
+        (old / "part-0000-deadbeef.parquet").touch()
+
+        inference_logger = InferenceLogger(log_path=str(log_path), flush_seconds=0)
+        inference_logger.log_prediction(
+            prediction_id="pred_1",
+            designation="Jouet",
+            description="En bois",
+            predicted_class=10,
+            confidence=0.9,
+            model_version="1",
+            model_stage="Production",
+        )
+        inference_logger.close()
+
+        assert not (dataset_path / "date=2000-01-01").exists()
+        assert DriftMonitor(inference_log_path=str(log_path)).count_samples() == 1
@@ -11,6 +11,7 @@ from src.monitoring.statistical_tests import (
     chi_square_test,
     jensen_shannon_divergence,
     compute_drift_scores,
+    summarize_reference,
 )
 
 
@@ -136,3 +137,15 @@ class TestComputeDriftScores:
         cur = pd.DataFrame({"other_col": [4, 5, 6]})
         result = compute_drift_scores(ref, cur)
         assert result["overall_drift_score"] == 0.0
+
+    def test_precomputed_reference_summary_gives_same_scores(
+        self, sample_inference_log
+    ):
+        ref = sample_inference_log.head(120)
+        cur = sample_inference_log.tail(80)
+        summary = summarize_reference(ref)
+
+        assert compute_drift_scores(ref, cur, reference_summary=summary) == (
+            compute_drift_scores(ref, cur)
+        )
+        assert np.all(np.diff(summary["text_length"]["sorted"]) >= 0)
@@ -0,0 +1,82 @@
+"""
+Unit tests for src/features/text_features.py
+"""
+import numpy as np
+import pandas as pd
+
+from src.features.text_features import TextFeatureExtractor
+from src.utils.text_preprocessing import clean_text
+
+
+class TestCombineTexts:
+    """Combined text must match per-row cleaning of both fields."""
+
+    def test_matches_row_by_row_cleaning(self):
+        df = pd.DataFrame(
+            {
+                "designation": ["<b>Jouet</b> AB-123", "x", None],
+                "description": [np.nan, "voir www.shop.fr", "ref: ZX-900 ok"],
+            },
+            index=[5, 3, 9],
+        )
+
+        expected = [
+            f"{clean_text(str(d))} {clean_text(str(e))}"
+            for d, e in zip(df["designation"], df["description"])
+        ]
+
+        assert TextFeatureExtractor()._combine_texts(df) == expected
+
+    def test_missing_column_is_empty(self):
+        df = pd.DataFrame({"designation": ["Jouet"]})
+
+        assert TextFeatureExtractor()._combine_texts(df) == ["jouet "]
+
+
+class TestFitCache:
+    """A cached fit must be reused for identical input and settings only."""
+
+    def test_reuses_cached_fit(self, tmp_path):
+        df = pd.DataFrame(
+            {
+                "designation": ["jouet enfant", "livre ancien", "jouet bois"],
+                "description": ["rouge", "papier", "bleu"],
+            }
+        )
+
+        first = TextFeatureExtractor(cache_dir=tmp_path)
+        expected = first.fit_transform(df)
+        assert len(list(tmp_path.glob("tfidf_*.joblib"))) == 1
+
+        second = TextFeatureExtractor(cache_dir=tmp_path)
+        second.vectorizer = None  # would fail if fit ran again
+        cached = second.fit_transform(df)
+
+        assert (cached != expected).nnz == 0
+        assert second.transform(df).shape == expected.shape
+
+    def test_settings_change_the_key(self, tmp_path):
+        df = pd.DataFrame({"designation": ["jouet"], "description": ["rouge"]})
+
+        assert (
+            TextFeatureExtractor(cache_dir=tmp_path)._fit_cache_key(df)
+            != TextFeatureExtractor(cache_dir=tmp_path, max_features=10)._fit_cache_key(df)
+        )
+
+
+class TestVectorizerPersistence:
+    """Saved vectorizers load back with the same vocabulary."""
+
+    def test_save_load_round_trip(self, tmp_path):
+        df = pd.DataFrame(
+            {"designation": ["jouet enfant", "jouet bois"], "description": ["a", "b"]}
+        )
+        extractor = TextFeatureExtractor(min_df=1)
+        extractor.fit_transform(df)
+        path = tmp_path / "vectorizer.joblib"
+
+        extractor.save_vectorizer(path)
+        loaded = TextFeatureExtractor()
+        loaded.load_vectorizer(path)
+
+        assert loaded.vectorizer.vocabulary_ == extractor.vectorizer.vocabulary_
@@ -0,0 +1,51 @@
+"""
+Unit tests for src/utils/text_preprocessing.py
+"""
+import numpy as np
+import pandas as pd
+
+from src.utils import text_preprocessing
+from src.utils.text_preprocessing import clean_text, clean_text_series
+
+
+class TestCleanTextSeries:
+    """The column-wise cleaner must match clean_text row by row."""
+
+    def test_matches_row_by_row_cleaning(self):
+        texts = pd.Series([
+            "<p>Jouet&nbsp;<b>Enfant</b></p>",
+            "Voir http://shop.fr/x et www.test.com",
+            "contact: vente@shop.fr",
+            "Réf: AB-12345 modèle ZZ-99",
+            "code 1234567 ou é1234567",
+            "123456 654321",
+            "  \t\n",
+            "Café\xa0crème sucré",
+            None,
+            np.nan,
+            42,
+        ])
+
+        expected = texts.apply(clean_text)
+        result = clean_text_series(texts)
+
+        assert result.tolist() == expected.tolist()
+        assert result.index.equals(texts.index)
+
+    def test_missing_values_become_empty_strings(self):
+        result = clean_text_series(pd.Series([None, np.nan], index=[5, 7]))
+
+        assert result.tolist() == ["", ""]
+        assert result.index.tolist() == [5, 7]
+
+    def test_parallel_chunks_match_serial(self, monkeypatch):
+        monkeypatch.setattr(text_preprocessing, "PARALLEL_MIN_ROWS", 4)
+        texts = pd.Series(
+            ["<b>Jouet</b> réf: AB-123", None, "voir www.shop.fr", "x  y", "123456 a"],
+            index=[4, 0, 3, 1, 2],
+        )
+
+        result = clean_text_series(texts, n_jobs=2)
+
+        assert result.tolist() == clean_text_series(texts).tolist()
+        assert result.index.equals(texts.index)